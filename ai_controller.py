@@ -1,5 +1,10 @@
 import random
+from operator import attrgetter
 from game_engine import Phase
+from card_manager import SPIRIT, SPELL
+
+# Phases the AI passes through without deciding anything
+_AUTO_ADVANCE_PHASES = frozenset((Phase.ATTAINMENT, Phase.RESPITE))
 
 class AIController:
     def __init__(self, difficulty="medium"):
@@ -11,12 +16,12 @@ class AIController:
         player_state = game.players["npc"]
         opponent_state = game.players["player"]
         
-        if game.current_phase == Phase.MEMORIZATION:
+        if game.current_phase is Phase.MEMORIZATION:
             # --- Check one card rule ---
             if player_state.placed_card_this_turn:
                 return {"type": "advance_phase"}
             return self.get_memorization_move(game, player_state, opponent_state)
-        elif game.current_phase == Phase.INVOCATION:
+        elif game.current_phase is Phase.INVOCATION:
             return self.get_invocation_move(game, player_state, opponent_state)
         else:
             return {"type": "advance_phase"}
@@ -24,12 +29,13 @@ class AIController:
     def get_memorization_move(self, game, player, opponent):
         """Decide what to do during memorization phase"""
         moves = []
+        # The engine keeps the hand bucketed by type, so no need to filter it here
+        spirits_in_hand = player.hand_by_type[SPIRIT]
+        spells_in_hand = player.hand_by_type[SPELL]
         
         # 1. Try to summon spirits if we have empty slots
         empty_spirit_slots = [i for i, spirit in enumerate(player.spirit_slots) if spirit is None]
         if empty_spirit_slots and player.hand:
-            # Find spirits in hand
-            spirits_in_hand = [card for card in player.hand if card.type == "spirit"]
             if spirits_in_hand:
                 spirit = self.choose_best_spirit(spirits_in_hand)
                 slot = empty_spirit_slots[0]
@@ -37,17 +43,14 @@ class AIController:
         
         # 2. Try to prepare spells
         if player.hand:
-            # Find spells in hand
-            spells_in_hand = [card for card in player.hand if card.type == "spell"]
             if spells_in_hand:
                 # Try to stack existing spells first
                 for slot_idx, spell_stack in enumerate(player.spell_slots):
                     if spell_stack and len(spell_stack) < 3:  # Stack not full
                         stack_spell_name = spell_stack[0].name
                         # Check if we have more of this spell in hand
-                        for spell in spells_in_hand:
-                            if spell.name == stack_spell_name:
-                                return {"type": "prepare_spell", "spell_name": spell.name, "slot_index": slot_idx}
+                        if player.find_in_hand(SPELL, stack_spell_name):
+                            return {"type": "prepare_spell", "spell_name": stack_spell_name, "slot_index": slot_idx}
                 
                 # No stacks to add to, find empty slot
                 empty_spell_slots = [i for i, stack in enumerate(player.spell_slots) if not stack]
@@ -57,7 +60,6 @@ class AIController:
                     return {"type": "prepare_spell", "spell_name": spell.name, "slot_index": slot}
         
         # 3. Replace weak spells if no other options
-        spells_in_hand = [card for card in player.hand if card.type == "spell"]
         if player.spell_slots and spells_in_hand:
             # Find weakest spell stack (lowest activation cost or damage)
             weakest_slot = self.find_weakest_spell_slot(player.spell_slots)
@@ -75,11 +77,11 @@ class AIController:
         moves = []
         
         # 1. Activate damaging spells if opponent has spirits
-        opponent_has_spirits = any(opponent.spirit_slots)
+        opponent_has_spirits = opponent.spirits_alive > 0
         if opponent_has_spirits:
             for slot_idx, spell_stack in enumerate(player.spell_slots):
                 # --- USE KEYWORDS ---
-                if spell_stack and spell_stack[0].effects.get("aoe_damage"):
+                if spell_stack and spell_stack[0].aoe_damage:
                     spell = spell_stack[0]
                     # Check if we can afford to use at least one copy
                     if player.aether >= spell.activation_cost:
@@ -92,7 +94,7 @@ class AIController:
         if player.wizard_hp <= 10:  # Below 50% HP
             for slot_idx, spell_stack in enumerate(player.spell_slots):
                 # --- USE KEYWORDS ---
-                if spell_stack and spell_stack[0].effects.get("heal_wizard"):
+                if spell_stack and spell_stack[0].heal_wizard:
                     spell = spell_stack[0]
                     if player.aether >= spell.activation_cost:
                         max_copies = min(len(spell_stack), player.aether // spell.activation_cost)
@@ -103,7 +105,7 @@ class AIController:
         for slot_idx, spirit in enumerate(player.spirit_slots):
             if spirit and player.aether >= spirit.activation_cost:
                 # --- USE KEYWORDS ---
-                can_attack_directly = (not opponent_has_spirits) or spirit.effects.get("direct_attack")
+                can_attack_directly = (not opponent_has_spirits) or spirit.direct_attack
                 
                 if can_attack_directly:
                     # Attack wizard if we can kill or do significant damage
@@ -127,32 +129,23 @@ class AIController:
         if not spirits:
             return None
         
-        # Simple scoring system
-        def score_spirit(spirit):
-            score = spirit.power + spirit.defense + (spirit.max_hp / 4)
-            # --- USE KEYWORDS ---
-            if spirit.effects.get("direct_attack"):
-                score += 2  # Bonus for overwhelm ability
-            if spirit.effects.get("reduce_defense"):
-                score += 1  # Bonus for debuff ability
-            return score
-        
-        return max(spirits, key=score_spirit)
+        # Score is precomputed by CardManager from stats and effects
+        return max(spirits, key=attrgetter("ai_spirit_score"))
     
     def choose_best_spell(self, spells, game):
         """Choose the best spell to prepare"""
         if not spells:
             return None
         
-        opponent_has_spirits = any(game.players["player"].spirit_slots)
+        opponent_has_spirits = game.players["player"].spirits_alive > 0
         
         def score_spell(spell):
             score = 0
             # --- USE KEYWORDS ---
-            if spell.effects.get("aoe_damage") and opponent_has_spirits:
+            if spell.aoe_damage and opponent_has_spirits:
                 score += spell.scaling * 2  # Higher value for damage when opponent has spirits
-            elif spell.effects.get("heal_wizard"):
-                score += spell.effects.get("heal_wizard", 0)  # Healing is good
+            elif spell.heal_wizard:
+                score += spell.heal_wizard  # Healing is good
             score -= spell.activation_cost  # Lower cost is better
             return score
         
@@ -169,7 +162,7 @@ class AIController:
                 # Score based on cost and effect
                 score = spell.activation_cost
                 # --- USE KEYWORDS ---
-                if spell.effects.get("heal_wizard"):
+                if spell.heal_wizard:
                     score += 1  # Slightly prefer to keep healing spells
                 if score < weakest_score:
                     weakest_score = score
@@ -180,7 +173,7 @@ class AIController:
     def find_better_spell(self, hand, current_spell):
         """Find a spell in hand that's better than the current one"""
         for card in hand:
-            if card.type == "spell":
+            if card.type is SPELL:
                 # Simple comparison: lower cost or higher scaling is better
                 if (card.activation_cost < current_spell.activation_cost or 
                     (card.scaling > current_spell.scaling)):
@@ -221,7 +214,7 @@ class AIController:
                action_count < max_actions):
             
             # Auto-advance attunement and respite
-            if game.current_phase in [Phase.ATTAINMENT, Phase.RESPITE]:
+            if game.current_phase in _AUTO_ADVANCE_PHASES:
                 game.next_phase()
                 continue # Loop again to process next phase
 
@@ -230,7 +223,7 @@ class AIController:
             if move["type"] == "advance_phase":
                 game.next_phase()
                 # If we're advancing from invocation, the turn is over
-                if game.current_phase == Phase.RESPITE:
+                if game.current_phase is Phase.RESPITE:
                     game.next_phase() # End the turn
                     break
             
@@ -267,6 +260,6 @@ class AIController:
         
         # Ensure turn ends if loop finishes
         if game.current_player == "npc" and not game.game_over:
-            if game.current_phase != Phase.ATTAINMENT: # If we are not already on the next player's turn
+            if game.current_phase is not Phase.ATTAINMENT: # If we are not already on the next player's turn
                 game.current_phase = Phase.RESPITE
                 game.next_phase() # This will pass the turn
\ No newline at end of file
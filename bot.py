@@ -6,6 +6,8 @@ import json # Import json for deck management
 from io import BytesIO
 from dotenv import load_dotenv
 import asyncio
+import functools
+from collections import defaultdict
 import aiohttp # For async web requests (Stability AI)
 import base64 # For handling Stability AI response
 
@@ -22,7 +24,7 @@ STABILITY_API_KEY = os.environ.get("STABILITY_API_KEY")
 STABILITY_MODEL_ID = os.environ.get("STABILITY_MODEL_ID", "stable-diffusion-v1-6") # Default model
 
 # Process the loaded variables
-ADMIN_USER_IDS = [int(id.strip()) for id in ADMIN_IDS_STR.split(',') if id.strip()]
+ADMIN_USER_IDS = frozenset(int(id.strip()) for id in ADMIN_IDS_STR.split(',') if id.strip())
 
 # --- MODIFIED: Process multiple guild IDs ---
 TEST_GUILD_IDS = [int(id.strip()) for id in TEST_GUILD_ID_STR.split(',') if id.strip()]
@@ -36,7 +38,7 @@ if not ADMIN_USER_IDS:
 # ---------------------------
 
 # Import your new DISCORD game logic and card manager
-from discord_engine import ArcanaGame, Phase
+from discord_engine import ArcanaGame, Phase, prewarm as prewarm_decks
 from card_manager import CardManager
 from discord_ai_controller import DiscordAIController
 
@@ -94,9 +96,12 @@ def load_user_deck(user_id: int) -> dict:
 def save_user_deck(user_id: int, deck_data: dict):
     """Saves a user's custom deck to their JSON file."""
     deck_path = get_user_deck_path(user_id)
+    tmp_path = deck_path + ".tmp"
     try:
-        with open(deck_path, 'w') as f:
-            json.dump(deck_data, f, indent=2)
+        # Write to a temp file and swap it in, so a crash mid-write can't corrupt the deck
+        with open(tmp_path, 'w') as f:
+            f.write(json.dumps(deck_data, separators=(',', ':')))
+        os.replace(tmp_path, deck_path)
     except Exception as e:
         print(f"Error saving deck for user {user_id}: {e}")
 
@@ -380,6 +385,24 @@ async def generate_board_image(game: ArcanaGame) -> BytesIO:
 
 # --- Game Action Views ---
 
+# Caps how many button interactions can be in flight per channel at once,
+# so rapid clicking can't stack up board renders and fetch_user calls.
+MAX_CONCURRENT_INTERACTIONS = 4
+_CHANNEL_SEM: dict[int, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(MAX_CONCURRENT_INTERACTIONS))
+
+def channel_limited(callback):
+    """Decorator for view/button callbacks that gates them on the channel's semaphore."""
+    @functools.wraps(callback)
+    async def wrapper(self, interaction: discord.Interaction, *args):
+        sem = _CHANNEL_SEM[interaction.channel_id]
+        if sem.locked():
+            # Interactions must be answered within 3 seconds, so don't queue indefinitely
+            await interaction.response.send_message("Still working on previous actions, please try again in a moment.", ephemeral=True)
+            return
+        async with sem:
+            await callback(self, interaction, *args)
+    return wrapper
+
 class GameActionView(discord.ui.View):
     """
     The main UI view with buttons for actions.
@@ -455,6 +478,7 @@ class GameActionView(discord.ui.View):
         )
 
     @discord.ui.button(label="Summon", style=discord.ButtonStyle.green, custom_id="summon_spirit")
+    @channel_limited
     async def summon(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not await self._check_turn(interaction): return
 
@@ -462,8 +486,7 @@ class GameActionView(discord.ui.View):
             await interaction.response.send_message("You can only summon in the Memorization phase.", ephemeral=True)
             return
 
-        player_hand = self.game.players[interaction.user.id].hand
-        spirit_cards = [card for card in player_hand if card.type == "spirit"]
+        spirit_cards = self.game.players[interaction.user.id].hand_by_type["spirit"]
 
         if not spirit_cards:
             await interaction.response.send_message("You have no spirits in your hand to summon.", ephemeral=True)
@@ -477,6 +500,7 @@ class GameActionView(discord.ui.View):
         )
 
     @discord.ui.button(label="Prepare", style=discord.ButtonStyle.primary, custom_id="prepare_spell")
+    @channel_limited
     async def prepare(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not await self._check_turn(interaction): return
 
@@ -484,8 +508,7 @@ class GameActionView(discord.ui.View):
             await interaction.response.send_message("You can only prepare in the Memorization phase.", ephemeral=True)
             return
         
-        player_hand = self.game.players[interaction.user.id].hand
-        spell_cards = [card for card in player_hand if card.type == "spell"]
+        spell_cards = self.game.players[interaction.user.id].hand_by_type["spell"]
 
         if not spell_cards:
             await interaction.response.send_message("You have no spells in your hand to prepare.", ephemeral=True)
@@ -498,6 +521,7 @@ class GameActionView(discord.ui.View):
         )
 
     @discord.ui.button(label="Attack", style=discord.ButtonStyle.danger, custom_id="attack_spirit")
+    @channel_limited
     async def attack(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not await self._check_turn(interaction): return
         
@@ -526,6 +550,7 @@ class GameActionView(discord.ui.View):
 
     # --- NEW: Activate Button ---
     @discord.ui.button(label="Activate", style=discord.ButtonStyle.primary, custom_id="activate_spell")
+    @channel_limited
     async def activate(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not await self._check_turn(interaction): return
 
@@ -554,6 +579,7 @@ class GameActionView(discord.ui.View):
         )
 
     @discord.ui.button(label="End Phase", style=discord.ButtonStyle.secondary, custom_id="end_phase")
+    @channel_limited
     async def end_phase(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not await self._check_turn(interaction): return
 
@@ -585,16 +611,20 @@ class GameActionView(discord.ui.View):
 
         # Send a ping to the next player (if it's a human)
         # Check that the new player isn't the user who just clicked, AND isn't the bot
+        ping = None
         if (self.game.current_player_id != interaction.user.id and 
             self.game.current_player_id != bot.user.id and
             not self.game.game_over):
             
             opponent_user = await bot.fetch_user(self.game.current_player_id)
-            await interaction.channel.send(f"Your turn, {opponent_user.mention}!")
+            ping = interaction.channel.send(f"Your turn, {opponent_user.mention}!")
             message_prefix = f"{current_player_name}'s turn has ended."
 
-        # Update the public board message
-        await self._update_board(interaction, message_prefix)
+        # Update the public board message (alongside the ping; they don't depend on each other)
+        tasks = [self._update_board(interaction, message_prefix)]
+        if ping:
+            tasks.append(ping)
+        await asyncio.gather(*tasks)
 
 
 # --- Memorization Phase Views (Summon/Prepare) ---
@@ -611,11 +641,12 @@ class SelectCardToPlayView(discord.ui.View):
         self.main_view = main_view
         
         # Dynamically create buttons based on hand
-        player_hand = self.game.players[self.game.current_player_id].hand
         card_type = "spirit" if action_type == "summon" else "spell"
+        typed_hand = self.game.players[self.game.current_player_id].hand_by_type[card_type]
         
-        # Get unique card names
-        valid_cards = {card.name: card for card in player_hand if card.type == card_type}.values()
+        # Get unique card names (first copy of each, in hand order)
+        seen = set()
+        valid_cards = [card for card in typed_hand if not (card.name in seen or seen.add(card.name))]
         
         for card in valid_cards:
             self.add_item(CardButton(game, card, action_type, main_view))
@@ -631,6 +662,7 @@ class CardButton(discord.ui.Button):
         self.action_type = action_type
         self.main_view = main_view
 
+    @channel_limited
     async def callback(self, interaction: discord.Interaction):
         # Now that a card is selected, show the slots
         if self.action_type == "summon":
@@ -676,7 +708,7 @@ class SelectSlotView(discord.ui.View):
                 if len(slots[i]) >= 3:
                     is_disabled = True
                     label += " (Full)"
-                elif slots[i] and slots[i][0].name != self.card.name:
+                elif slots[i] and slots[i][0].proto_id != self.card.proto_id:
                     is_disabled = True
                     label += " (Mismatch)"
 
@@ -695,6 +727,7 @@ class SlotButton(discord.ui.Button):
         self.slot_index = slot_index
         self.main_view = main_view
 
+    @channel_limited
     async def callback(self, interaction: discord.Interaction):
         player_id = interaction.user.id
         
@@ -742,6 +775,7 @@ class AttackerButton(discord.ui.Button):
         self.slot_index = slot_index
         self.main_view = main_view
 
+    @channel_limited
     async def callback(self, interaction: discord.Interaction):
         # Now that an attacker is selected, show the targets
         await interaction.response.edit_message(
@@ -763,8 +797,8 @@ class SelectAttackTargetView(discord.ui.View):
         opponent_state = self.game.players[self.game.get_opponent_id(self.game.current_player_id)]
         
         # Check Guard Rule
-        has_guard = any(opponent_state.spirit_slots)
-        can_attack_wizard = not has_guard or self.attacker_spirit.effects.get("direct_attack", False)
+        has_guard = opponent_state.spirits_alive > 0
+        can_attack_wizard = not has_guard or self.attacker_spirit.direct_attack
 
         # Add Wizard target
         self.add_item(TargetButton(
@@ -810,6 +844,7 @@ class TargetButton(discord.ui.Button):
         self.target_index = target_index
         self.main_view = main_view
 
+    @channel_limited
     async def callback(self, interaction: discord.Interaction):
         player_id = interaction.user.id
         
@@ -854,6 +889,7 @@ class SpellSlotActivateButton(discord.ui.Button):
         self.stack_size = stack_size
         self.main_view = main_view
 
+    @channel_limited
     async def callback(self, interaction: discord.Interaction):
         # Now that a spell is selected, show the copies view
         await interaction.response.edit_message(
@@ -910,6 +946,7 @@ class CopiesButton(discord.ui.Button):
         self.num_copies = num_copies
         self.main_view = main_view
 
+    @channel_limited
     async def callback(self, interaction: discord.Interaction):
         player_id = interaction.user.id
         
@@ -936,6 +973,9 @@ async def on_ready():
     global ai_controller_instance
     ai_controller_instance = DiscordAIController(bot.user.id)
     print(f"AI Controller initialized for bot ID {bot.user.id}")
+
+    # --- Parse default decks now so the first /challenge doesn't wait on disk ---
+    prewarm_decks()
     
     # --- Initialize HTTP Session for AI ---
     global http_session
@@ -985,7 +1025,7 @@ async def on_close():
 
 # --- Admin Check ---
 def is_admin():
-    """Custom check to see if the user is in the ADMIN_USER_IDS list."""
+    """Custom check to see if the user is in the ADMIN_USER_IDS set."""
     def predicate(interaction: discord.Interaction) -> bool:
         return interaction.user.id in ADMIN_USER_IDS
     return app_commands.check(predicate)
@@ -1,40 +1,115 @@
 import json
 import os
+import sys
+import logging
 
-# We need to dynamically import the Card class from one of the engines
-# It's defined in both, so we can just pick one.
-# This is a bit of a workaround for sharing the class definition.
+# orjson is optional; it makes saving the card library much faster if installed.
 try:
-    from game_engine import Card
+    import orjson
 except ImportError:
-    print("Could not import Card from game_engine, trying discord_engine...")
-    try:
-        from discord_engine import Card
-    except ImportError:
-        print("CRITICAL: Could not import Card class from game_engine or discord_engine.")
-        # Define a fallback class so the file can at least be imported
-        class Card:
-             def __init__(self, name, card_type, activation_cost, power=0, defense=0, hp=0, effect="", scaling=0, element="", effects=None):
-                self.name = name
-                self.type = card_type
-                self.activation_cost = activation_cost
-                self.power = power
-                self.defense = defense
-                self.max_hp = hp
-                self.current_hp = hp
-                self.effect = effect
-                self.scaling = scaling
-                self.element = element
-                self.effects = effects if effects is not None else {}
-                print("Using fallback Card class")
+    orjson = None
+
+log = logging.getLogger(__name__)
+
+# Card type tags. Interned so hot paths can compare with `is`.
+SPIRIT = sys.intern("spirit")
+SPELL = sys.intern("spell")
+ENEMY_SPIRITS = sys.intern("enemy_spirits") # AoE target keyword
+
+# Parsed libraries shared across CardManager instances:
+# file_path -> (mtime, cards, index, prototypes)
+_CARD_CACHE = {}
+
+# card_id -> small int, stable for the life of the process (survives card edits)
+_PROTO_IDS = {}
+
+class Card:
+    """
+    A single card. This is the only Card definition; both engines import it from here.
+    """
+    __slots__ = ("name", "type", "activation_cost", "power", "defense", "max_hp",
+                 "current_hp", "effect", "scaling", "element", "effects",
+                 # Effect keywords, unpacked from effects so combat code reads plain attributes
+                 "direct_attack", "reduce_defense", "prevent_defense_reduction",
+                 "aoe_damage", "aoe_target", "heal_wizard", "heal_spirit",
+                 "ai_spirit_score", "proto_id")
+
+    def __init__(self, name, card_type, activation_cost, power=0, defense=0, hp=0, effect="", scaling=0, element="", effects=None):
+        self.name = sys.intern(name) # Names come from a fixed library; interned so equal names compare by pointer
+        self.type = card_type  # SPIRIT or SPELL
+        self.activation_cost = activation_cost
+        self.power = power
+        self.defense = defense
+        self.max_hp = hp
+        self.current_hp = hp
+        self.effect = effect # Keep for display
+        self.scaling = scaling
+        self.element = element
+        self.effects = effects if effects is not None else {} # Raw keywords, kept for display
+        self.direct_attack = bool(self.effects.get("direct_attack"))
+        self.reduce_defense = self.effects.get("reduce_defense", 0)
+        self.prevent_defense_reduction = bool(self.effects.get("prevent_defense_reduction"))
+        self.aoe_damage = bool(self.effects.get("aoe_damage"))
+        target = self.effects.get("target")
+        self.aoe_target = sys.intern(target) if isinstance(target, str) else target
+        self.heal_wizard = self.effects.get("heal_wizard", 0)
+        self.heal_spirit = self.effects.get("heal_spirit", 0)
+        # AI scoring key and library id, filled in by CardManager for library prototypes
+        self.ai_spirit_score = 0
+        self.proto_id = None
+
+    def clone(self):
+        """
+        Returns a fresh copy of this card without going through __init__.
+        The effects dict is shared, not copied; it is never mutated per instance.
+        """
+        c = Card.__new__(Card)
+        c.name = self.name
+        c.type = self.type
+        c.activation_cost = self.activation_cost
+        c.power = self.power
+        c.defense = self.defense
+        c.max_hp = self.max_hp
+        c.current_hp = self.current_hp
+        c.effect = self.effect
+        c.scaling = self.scaling
+        c.element = self.element
+        c.effects = self.effects
+        c.direct_attack = self.direct_attack
+        c.reduce_defense = self.reduce_defense
+        c.prevent_defense_reduction = self.prevent_defense_reduction
+        c.aoe_damage = self.aoe_damage
+        c.aoe_target = self.aoe_target
+        c.heal_wizard = self.heal_wizard
+        c.heal_spirit = self.heal_spirit
+        c.ai_spirit_score = self.ai_spirit_score
+        c.proto_id = self.proto_id
+        return c
+
+    __copy__ = clone
 
 
 class CardManager:
     def __init__(self):
         self.cards = {}
+        self._index = {} # card_id -> (category, card_data)
+        self._all_ids = None # Cached tuple of card IDs, rebuilt lazily
+        self._prototypes = {} # card_id -> Card, copied for each new instance
         self.load_cards()
     
-    def load_cards(self, file_path="config/cards.json"):
+    def load_cards(self, file_path="config/cards.json", use_cache=True):
+        # Reuse another manager's parse if the file hasn't changed since
+        if use_cache:
+            try:
+                mtime = os.stat(file_path).st_mtime
+            except OSError:
+                mtime = None
+            entry = _CARD_CACHE.get(file_path)
+            if entry and entry[0] == mtime:
+                _, self.cards, self._index, self._prototypes = entry
+                self._all_ids = None
+                return
+
         # Create default cards if file doesn't exist
         default_cards = {
             "spirits": {
@@ -86,55 +161,101 @@ class CardManager:
         
         # Try to load from file, or use defaults
         try:
-            if os.path.exists(file_path):
-                with open(file_path, 'r') as f:
-                    self.cards = json.load(f)
-            else:
-                print(f"Warning: {file_path} not found. Creating with default cards.")
+            try:
+                with open(file_path, 'rb') as f:
+                    self.cards = json.loads(f.read())
+            except FileNotFoundError:
+                log.warning("%s not found. Creating with default cards.", file_path)
                 self.cards = default_cards
                 # Create directory if it doesn't exist
                 config_dir = os.path.dirname(file_path)
-                if config_dir and not os.path.exists(config_dir):
+                if config_dir:
                     os.makedirs(config_dir, exist_ok=True)
                 # Save defaults
-                with open(file_path, 'w') as f:
-                    json.dump(default_cards, f, indent=2)
+                with open(file_path, 'wb') as f:
+                    f.write(json.dumps(default_cards, indent=2).encode())
         except Exception as e:
-            print(f"Error loading cards: {e}")
+            log.error("Error loading cards: %s", e)
             self.cards = default_cards
+
+        self._build_index()
+        self._update_cache(file_path)
+
+    def _update_cache(self, file_path):
+        try:
+            mtime = os.stat(file_path).st_mtime
+        except OSError:
+            return
+        _CARD_CACHE[file_path] = (mtime, self.cards, self._index, self._prototypes)
+
+    def _build_index(self):
+        """
+        Flattens the library into a single card_id -> (category, card_data) lookup
+        and builds one prototype Card per ID for create_card_instance to copy.
+        """
+        self._index = {
+            card_id: (category, card_data)
+            for category in ("spirits", "spells")
+            for card_id, card_data in self.cards.get(category, {}).items()
+        }
+        self._all_ids = None
+        self._prototypes = {}
+        for card_id in self._index:
+            self._index_prototype(card_id)
+
+    def _index_prototype(self, card_id):
+        category, card_data = self._index[card_id]
+        try:
+            prototype = self._build_card(category, card_data)
+        except (KeyError, TypeError) as e:
+            self._prototypes.pop(card_id, None)
+            log.warning("Could not build card '%s': %s", card_id, e)
+            return
+
+        # Precompute the AI's spirit score so it isn't recalculated every decision
+        prototype.ai_spirit_score = prototype.power + prototype.defense + (prototype.max_hp / 4)
+        if prototype.direct_attack:
+            prototype.ai_spirit_score += 2
+        if prototype.reduce_defense:
+            prototype.ai_spirit_score += 1
+        # Copies of the same library card share this, so stacks can be checked with an int compare
+        prototype.proto_id = _PROTO_IDS.setdefault(card_id, len(_PROTO_IDS) + 1)
+        self._prototypes[card_id] = prototype
+
+    def _index_card(self, card_id, category):
+        """Refreshes the lookup and prototype for a single card after an in-memory edit."""
+        if card_id not in self._index:
+            self._all_ids = None
+        self._index[card_id] = (category, self.cards[category][card_id])
+        self._index_prototype(card_id)
     
     def get_card(self, card_id):
         """Gets the raw data for a card from the library."""
-        for category in ["spirits", "spells"]:
-            if card_id in self.cards.get(category, {}):
-                return self.cards[category][card_id]
-        return None
+        return self._index.get(card_id, (None, None))[1]
 
     def get_card_type(self, card_id) -> str | None:
         """Returns the category ('spirits' or 'spells') of a card ID."""
-        if card_id in self.cards.get("spirits", {}):
-            return "spirits"
-        if card_id in self.cards.get("spells", {}):
-            return "spells"
-        return None
+        return self._index.get(card_id, (None, None))[0]
     
     def create_card_instance(self, card_id):
         """
         Finds a card by its ID in the library (spirits or spells)
         and returns a new Card object instance.
         """
-        card_data = self.get_card(card_id)
-        card_type = self.get_card_type(card_id)
-
-        if not card_data or not card_type:
-            # print(f"Error: Card ID '{card_id}' not found in card library.")
+        prototype = self._prototypes.get(card_id)
+        if prototype is None:
+            log.debug("Card ID '%s' not found in card library.", card_id)
             return None # Card ID not found in library
         
-        # Create instance based on type
+        # Per-instance state (current_hp, defense) is plain ints, so a shallow clone is enough.
+        return prototype.clone()
+
+    def _build_card(self, card_type, card_data):
+        """Creates a Card from raw library data."""
         if card_type == "spirits":
             return Card(
                 name=card_data["name"],
-                card_type="spirit", # Use singular 'spirit'
+                card_type=SPIRIT, # Use singular 'spirit'
                 activation_cost=card_data.get("activation_cost", 0),
                 power=card_data.get("power", 0),
                 defense=card_data.get("defense", 0),
@@ -145,7 +266,7 @@ class CardManager:
         else:  # spells
             return Card(
                 name=card_data["name"],
-                card_type="spell", # Use singular 'spell'
+                card_type=SPELL, # Use singular 'spell'
                 activation_cost=card_data.get("activation_cost", 0),
                 effect=card_data.get("effect", ""),
                 scaling=card_data.get("scaling", 0),
@@ -155,11 +276,17 @@ class CardManager:
     
     def save_cards(self, file_path="config/cards.json"):
         try:
-            with open(file_path, 'w') as f:
-                json.dump(self.cards, f, indent=2)
+            # Encode up front so the file gets a single write (kept indented, it's hand-edited)
+            if orjson:
+                data = orjson.dumps(self.cards, option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps(self.cards, indent=2).encode()
+            with open(file_path, 'wb') as f:
+                f.write(data)
+            self._update_cache(file_path)
             return True
         except Exception as e:
-            print(f"Error saving cards: {e}")
+            log.error("Error saving cards: %s", e)
             return False
     
     def update_card(self, card_id, new_data, category: str):
@@ -172,17 +299,15 @@ class CardManager:
         
         self.cards[category][card_id] = new_data
         
-        # Reload the cards in the manager after saving
-        success = self.save_cards()
-        self.load_cards() # Reload to ensure consistency
-        return success
+        # self.cards is already up to date, so just refresh this card instead of reloading the file
+        self._index_card(card_id, category)
+        return self.save_cards()
     
-    def get_all_card_ids(self) -> list[str]:
-        """Gets a list of all card IDs from both spirits and spells."""
-        card_ids = []
-        for category in ["spirits", "spells"]:
-            card_ids.extend(self.cards.get(category, {}).keys())
-        return card_ids
+    def get_all_card_ids(self) -> tuple[str, ...]:
+        """Gets all card IDs from both spirits and spells (spirits first)."""
+        if self._all_ids is None:
+            self._all_ids = tuple(self._index)
+        return self._all_ids
 
     # --- NEW: remove_card ---
     def remove_card(self, card_id):
@@ -196,13 +321,15 @@ class CardManager:
                 del self.cards[card_type][card_id]
                 success = self.save_cards()
                 if success:
-                    self.load_cards() # Reload to ensure consistency
+                    del self._index[card_id]
+                    self._all_ids = None
+                    self._prototypes.pop(card_id, None)
                     return True, f"Card '{card_id}' removed."
                 else:
-                    self.load_cards() # Reload to revert any in-memory changes
+                    self.load_cards(use_cache=False) # Reload to revert any in-memory changes
                     return False, "Failed to save changes."
             except Exception as e:
-                self.load_cards() # Reload on error
+                self.load_cards(use_cache=False) # Reload on error
                 return False, f"An error occurred: {e}"
         else:
             return False, f"Card '{card_id}' not found in '{card_type}'."
@@ -252,17 +379,17 @@ class CardManager:
             # Update the value
             target_dict[last_key] = typed_new_value
             
-            # Save and reload
+            # Save, then refresh just this card
             success = self.save_cards()
             if success:
-                self.load_cards()
+                self._index_card(card_id, card_type)
                 return True, f"Updated '{field_path}' to '{typed_new_value}'."
             else:
-                self.load_cards() # Revert
+                self.load_cards(use_cache=False) # Revert
                 return False, "Failed to save changes."
 
         except ValueError:
             return False, f"Type mismatch: Could not convert '{new_value_str}' to {type(old_value)}."
         except Exception as e:
-            self.load_cards() # Revert on any error
+            self.load_cards(use_cache=False) # Revert on any error
             return False, f"An error occurred: {e}"
\ No newline at end of file
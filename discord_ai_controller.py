@@ -1,11 +1,21 @@
 import random
+from operator import attrgetter
 from discord_engine import Phase
+from card_manager import SPIRIT, SPELL
 
 class DiscordAIController:
     def __init__(self, bot_id, difficulty="medium"):
         self.difficulty = difficulty
         self.bot_id = bot_id # <-- Store the bot's user ID
         self.last_action = None
+        # Move type -> handler. Handlers return True if the phase should advance afterwards.
+        self._handlers = {
+            "summon_spirit": self._do_summon,
+            "prepare_spell": self._do_prepare,
+            "replace_spell": self._do_replace,
+            "activate_spell": self._do_activate,
+            "attack": self._do_attack,
+        }
     
     def get_move(self, game):
         """Returns the next move for the NPC based on current game state"""
@@ -24,11 +34,13 @@ class DiscordAIController:
     
     def get_memorization_move(self, game, player, opponent):
         """Decide what to do during memorization phase"""
+        # The engine keeps the hand bucketed by type, so no need to filter it here
+        spirits_in_hand = player.hand_by_type[SPIRIT]
+        spells_in_hand = player.hand_by_type[SPELL]
         
         # 1. Try to summon spirits if we have empty slots
         empty_spirit_slots = [i for i, spirit in enumerate(player.spirit_slots) if spirit is None]
         if empty_spirit_slots and player.hand:
-            spirits_in_hand = [card for card in player.hand if card.type == "spirit"]
             if spirits_in_hand:
                 spirit = self.choose_best_spirit(spirits_in_hand)
                 slot = empty_spirit_slots[0]
@@ -36,15 +48,14 @@ class DiscordAIController:
         
         # 2. Try to prepare spells
         if player.hand:
-            spells_in_hand = [card for card in player.hand if card.type == "spell"]
             if spells_in_hand:
                 # Try to stack existing spells first
+                spell_names_in_hand = {spell.name for spell in spells_in_hand}
                 for slot_idx, spell_stack in enumerate(player.spell_slots):
                     if spell_stack and len(spell_stack) < 3:
                         stack_spell_name = spell_stack[0].name
-                        for spell in spells_in_hand:
-                            if spell.name == stack_spell_name:
-                                return {"type": "prepare_spell", "spell_name": spell.name, "slot_index": slot_idx}
+                        if stack_spell_name in spell_names_in_hand:
+                            return {"type": "prepare_spell", "spell_name": stack_spell_name, "slot_index": slot_idx}
                 
                 # No stacks to add to, find empty slot
                 empty_spell_slots = [i for i, stack in enumerate(player.spell_slots) if not stack]
@@ -54,7 +65,6 @@ class DiscordAIController:
                     return {"type": "prepare_spell", "spell_name": spell.name, "slot_index": slot}
         
         # 3. Replace weak spells if no other options
-        spells_in_hand = [card for card in player.hand if card.type == "spell"]
         if player.spell_slots and spells_in_hand:
             weakest_slot = self.find_weakest_spell_slot(player.spell_slots)
             if weakest_slot is not None:
@@ -69,11 +79,13 @@ class DiscordAIController:
         """Decide what to do during invocation phase"""
         
         # 1. Activate damaging spells if opponent has spirits
-        opponent_has_spirits = any(opponent.spirit_slots)
+        # Collect the live enemy spirits once; the attack loop below reuses them
+        opponent_spirits_live = [(i, s) for i, s in enumerate(opponent.spirit_slots) if s]
+        opponent_has_spirits = bool(opponent_spirits_live)
         if opponent_has_spirits:
             for slot_idx, spell_stack in enumerate(player.spell_slots):
                 # Use new effects logic
-                if spell_stack and spell_stack[0].effects.get("aoe_damage"):
+                if spell_stack and spell_stack[0].aoe_damage:
                     spell = spell_stack[0]
                     if player.aether >= spell.activation_cost:
                         max_copies = min(len(spell_stack), player.aether // spell.activation_cost)
@@ -84,7 +96,7 @@ class DiscordAIController:
         if player.wizard_hp <= 10:
             for slot_idx, spell_stack in enumerate(player.spell_slots):
                 # Use new effects logic
-                if spell_stack and spell_stack[0].effects.get("heal_wizard"):
+                if spell_stack and spell_stack[0].heal_wizard:
                     spell = spell_stack[0]
                     if player.aether >= spell.activation_cost:
                         max_copies = min(len(spell_stack), player.aether // spell.activation_cost)
@@ -95,14 +107,14 @@ class DiscordAIController:
         for slot_idx, spirit in enumerate(player.spirit_slots):
             if spirit and player.aether >= spirit.activation_cost:
                 # Use new effects logic
-                can_attack_directly = (not opponent_has_spirits) or spirit.effects.get("direct_attack")
+                can_attack_directly = (not opponent_has_spirits) or spirit.direct_attack
                 
                 if can_attack_directly:
                     if spirit.power >= opponent.wizard_hp or spirit.power >= 4:
                         return {"type": "attack", "spirit_slot": slot_idx, "target_type": "wizard"}
                 
                 if opponent_has_spirits:
-                    target_info = self.find_best_attack_target(spirit, opponent.spirit_slots)
+                    target_info = self.find_best_attack_target(spirit, opponent_spirits_live)
                     if target_info:
                         target_slot, can_kill = target_info
                         if can_kill or self.difficulty == "easy":
@@ -113,22 +125,18 @@ class DiscordAIController:
     
     def choose_best_spirit(self, spirits):
         if not spirits: return None
-        def score_spirit(spirit):
-            score = spirit.power + spirit.defense + (spirit.max_hp / 4)
-            if spirit.effects.get("direct_attack"): score += 2
-            if spirit.effects.get("reduce_defense"): score += 1
-            return score
-        return max(spirits, key=score_spirit)
+        # Score is precomputed by CardManager from stats and effects
+        return max(spirits, key=attrgetter("ai_spirit_score"))
     
     def choose_best_spell(self, spells, game, opponent):
         if not spells: return None
-        opponent_has_spirits = any(opponent.spirit_slots)
+        opponent_has_spirits = opponent.spirits_alive > 0
         def score_spell(spell):
             score = 0
-            if spell.effects.get("aoe_damage") and opponent_has_spirits:
+            if spell.aoe_damage and opponent_has_spirits:
                 score += spell.scaling * 2
-            elif spell.effects.get("heal_wizard"):
-                score += spell.effects.get("heal_wizard", 0)
+            elif spell.heal_wizard:
+                score += spell.heal_wizard
             score -= spell.activation_cost
             return score
         return max(spells, key=score_spell)
@@ -140,34 +148,38 @@ class DiscordAIController:
             if stack:
                 spell = stack[0]
                 score = spell.activation_cost
-                if spell.effects.get("heal_wizard"): score += 1
+                if spell.heal_wizard: score += 1
                 if score < weakest_score:
                     weakest_score = score
                     weakest_slot = slot_idx
         return weakest_slot
     
     def find_better_spell(self, hand, current_spell):
+        current_cost, current_scaling = current_spell.activation_cost, current_spell.scaling
         for card in hand:
-            if card.type == "spell":
-                if (card.activation_cost < current_spell.activation_cost or 
-                    (card.scaling > current_spell.scaling)):
+            if card.type is SPELL:
+                if (card.activation_cost < current_cost or 
+                    (card.scaling > current_scaling)):
                     return card
         return None
     
-    def find_best_attack_target(self, attacker, opponent_spirits):
+    def find_best_attack_target(self, attacker, opponent_spirits_live):
+        """opponent_spirits_live is a list of (slot_idx, spirit) for occupied slots only."""
         best_target = None
         best_score = -1
-        for slot_idx, defender in enumerate(opponent_spirits):
-            if defender:
-                damage = max(0, attacker.power - defender.defense)
-                can_kill = damage >= defender.current_hp
-                score = 0
-                if can_kill: score += 10
-                score += damage
-                score -= defender.power
-                if score > best_score:
-                    best_score = score
-                    best_target = (slot_idx, can_kill)
+        attack_power = attacker.power
+        # No target can score more than an unblocked kill on a 0-power spirit
+        max_score = 10 + max(0, attack_power)
+        for slot_idx, defender in opponent_spirits_live:
+            damage = max(0, attack_power - defender.defense)
+            can_kill = damage >= defender.current_hp
+            score = damage - defender.power
+            if can_kill: score += 10
+            if score > best_score:
+                best_score = score
+                best_target = (slot_idx, can_kill)
+                if score >= max_score:
+                    break
         return best_target
     
     def execute_ai_turn(self, game):
@@ -193,27 +205,12 @@ class DiscordAIController:
                     game.next_phase()
                     break
             
-            elif move["type"] == "summon_spirit":
-                success, message = game.summon_spirit(self.bot_id, move["spirit_name"], move["slot_index"])
-                game.next_phase()
-                continue # <-- *** FIX: Was 'break', now 'continue' ***
-            elif move["type"] == "prepare_spell":
-                success, message = game.prepare_spell(self.bot_id, move["spell_name"], move["slot_index"])
-                game.next_phase()
-                continue # <-- *** FIX: Was 'break', now 'continue' ***
-            elif move["type"] == "replace_spell":
-                success, message = game.replace_spell(self.bot_id, move["new_spell_name"], move["slot_index"])
-                game.next_phase()
-                continue # <-- Was 'break', now 'continue'
-            
-            elif move["type"] == "activate_spell":
-                success, message = game.activate_spell(self.bot_id, move["slot_index"], move["copies_used"])
-            
-            elif move["type"] == "attack":
-                if move["target_type"] == "wizard":
-                    success, message = game.attack_with_spirit(self.bot_id, move["spirit_slot"], "wizard")
-                else:
-                    success, message = game.attack_with_spirit(self.bot_id, move["spirit_slot"], "spirit", move["target_index"])
+            else:
+                handler = self._handlers.get(move["type"])
+                if handler and handler(game, move):
+                    # Placement moves end memorization; keep going into invocation
+                    game.next_phase()
+                    continue
             
             action_count += 1
             if game.game_over:
@@ -222,4 +219,29 @@ class DiscordAIController:
         if game.current_player_id == self.bot_id and not game.game_over:
             if game.current_phase != Phase.ATTAINMENT:
                 game.current_phase = Phase.RESPITE
-                game.next_phase()
\ No newline at end of file
+                game.next_phase()
+
+    # --- Move handlers (see self._handlers) ---
+
+    def _do_summon(self, game, move):
+        game.summon_spirit(self.bot_id, move["spirit_name"], move["slot_index"])
+        return True
+
+    def _do_prepare(self, game, move):
+        game.prepare_spell(self.bot_id, move["spell_name"], move["slot_index"])
+        return True
+
+    def _do_replace(self, game, move):
+        game.replace_spell(self.bot_id, move["new_spell_name"], move["slot_index"])
+        return True
+
+    def _do_activate(self, game, move):
+        game.activate_spell(self.bot_id, move["slot_index"], move["copies_used"])
+        return False
+
+    def _do_attack(self, game, move):
+        if move["target_type"] == "wizard":
+            game.attack_with_spirit(self.bot_id, move["spirit_slot"], "wizard")
+        else:
+            game.attack_with_spirit(self.bot_id, move["spirit_slot"], "spirit", move["target_index"])
+        return False
@@ -1,11 +1,14 @@
 import json
 import random
 import os
+import functools
+import logging
 from enum import Enum
+from card_manager import Card, ENEMY_SPIRITS # Shared card definition
 
-# Note: This file requires card_manager.py to be present
-# but does not import it directly at the top.
-# The CardManager instance is passed into the ArcanaGame constructor.
+# Note: The CardManager instance is passed into the ArcanaGame constructor.
+
+log = logging.getLogger(__name__)
 
 class Phase(Enum):
     ATTAINMENT = "attunement"
@@ -13,20 +16,69 @@ class Phase(Enum):
     INVOCATION = "invocation"
     RESPITE = "respite"
 
-class Card:
-    # --- ADDED 'effects' PARAMETER ---
-    def __init__(self, name, card_type, activation_cost, power=0, defense=0, hp=0, effect="", scaling=0, element="", effects=None):
-        self.name = name
-        self.type = card_type  # "spirit" or "spell"
-        self.activation_cost = activation_cost
-        self.power = power
-        self.defense = defense
-        self.max_hp = hp
-        self.current_hp = hp
-        self.effect = effect # Keep for display
-        self.scaling = scaling
-        self.element = element
-        self.effects = effects if effects is not None else {}
+# Phase order, precomputed so next_phase doesn't rebuild and search a list every tick
+_PHASE_ORDER = tuple(Phase)
+_PHASE_NEXT = dict(zip(_PHASE_ORDER, _PHASE_ORDER[1:] + _PHASE_ORDER[:1]))
+_LAST_PHASE = _PHASE_ORDER[-1]
+
+_MASK64 = (1 << 64) - 1
+
+def _batched_shuffle(cards, getrandbits=random.getrandbits):
+    """
+    In-place Fisher-Yates shuffle that gets two swap indexes out of each 64-bit draw
+    (Lemire's batched bounded-random method), instead of one PRNG call per swap.
+    Rejection on the leftover bits keeps every permutation equally likely.
+    """
+    i = len(cards)
+    while i > 2:
+        bound = i * (i - 1)
+        while True:
+            x = getrandbits(64) * i
+            idx1, leftover = x >> 64, x & _MASK64
+            x = leftover * (i - 1)
+            idx2, leftover = x >> 64, x & _MASK64
+            # Only draws whose leftover falls below 2**64 % bound are biased
+            if leftover >= bound or leftover >= (1 << 64) % bound:
+                break
+        cards[i - 1], cards[idx1] = cards[idx1], cards[i - 1]
+        cards[i - 2], cards[idx2] = cards[idx2], cards[i - 2]
+        i -= 2
+    if i == 2:
+        idx = getrandbits(1)
+        cards[1], cards[idx] = cards[idx], cards[1]
+
+@functools.lru_cache(maxsize=256)
+def _load_deck_config(path, mtime):
+    """
+    Parses a deck file. Cached on (path, mtime) so repeated games reuse the parse;
+    an edited file has a new mtime and gets re-read. Callers must not mutate the result.
+    """
+    with open(path, 'r') as f:
+        return json.load(f)
+
+@functools.lru_cache(maxsize=256)
+def _load_deck_entries(path, mtime):
+    """
+    Returns a deck file as a flat tuple of (card_id, quantity), spirits first then spells.
+    Entries with a non-integer or non-positive quantity are dropped here, once per file version.
+    """
+    deck_config = _load_deck_config(path, mtime)
+    entries = []
+    for section in ("spirits", "spells"):
+        for card_id, quantity in deck_config.get(section, {}).items():
+            if not isinstance(quantity, int) or quantity <= 0:
+                log.warning("Ignoring '%s' in %s (invalid quantity %r).", card_id, path, quantity)
+                continue
+            entries.append((card_id, quantity))
+    return tuple(entries)
+
+def prewarm(default_paths=("config/player_deck.json", "config/npc_deck.json")):
+    """Parses the default deck files ahead of time so the first game doesn't pay for it."""
+    for path in default_paths:
+        try:
+            _load_deck_entries(path, os.path.getmtime(path))
+        except (OSError, json.JSONDecodeError) as e:
+            log.warning("Could not prewarm deck %s: %s", path, e)
 
 class PlayerState:
     def __init__(self, name):
@@ -35,18 +87,61 @@ class PlayerState:
         self.aether = 0
         self.max_aether = 16
         self.hand = []
+        self.hand_by_type = {"spirit": [], "spell": []} # Same cards as hand, bucketed by type
+        self.hand_index = {} # (type, name) -> cards in hand with that type and name
+        self._hand_pos = {} # card -> its position in hand, for O(1) removal
         self.deck = []
         self.discard = []
         self.spirit_slots = [None, None, None]  # 3 slots
+        self.spirits_alive = 0 # Occupied spirit slots, kept in step with spirit_slots
         self.spell_slots = [[], [], [], []]     # 4 slots, each can hold a stack
         self.wizard_ability_used = False
         self.placed_card_this_turn = False
 
+    def add_to_hand(self, card):
+        """Adds a card to the hand, keeping the type buckets and name index in sync."""
+        self._hand_pos[card] = len(self.hand)
+        self.hand.append(card)
+        self.hand_by_type[card.type].append(card)
+        self.hand_index.setdefault((card.type, card.name), []).append(card)
+
+    def remove_from_hand(self, card):
+        """
+        Removes a card from the hand, keeping the type buckets and name index in sync.
+        The last card in hand is swapped into the freed position, so hand order isn't preserved.
+        """
+        pos = self._hand_pos.pop(card)
+        last = self.hand.pop()
+        if last is not card:
+            self.hand[pos] = last
+            self._hand_pos[last] = pos
+        self.hand_by_type[card.type].remove(card)
+        key = (card.type, card.name)
+        same_cards = self.hand_index[key]
+        same_cards.remove(card)
+        if not same_cards:
+            del self.hand_index[key]
+
+    def find_in_hand(self, card_type, name):
+        """Returns the first card in hand with this type and name, or None."""
+        same_cards = self.hand_index.get((card_type, name))
+        return same_cards[0] if same_cards else None
+
+    def clear_hand(self):
+        self.hand = []
+        self.hand_by_type = {"spirit": [], "spell": []}
+        self.hand_index = {}
+        self._hand_pos = {}
+
 class ArcanaGame:
-    def __init__(self, card_manager, player1_id, player2_id):
+    def __init__(self, card_manager, player1_id, player2_id, verbose=True):
         self.card_manager = card_manager
+        # When False, successful actions return an empty message instead of building one
+        # (for AI-only games where nobody reads them). Failure messages are always returned.
+        self.verbose = verbose
         self.player1_id = player1_id
         self.player2_id = player2_id
+        self._opponent_of = {player1_id: player2_id, player2_id: player1_id}
         
         self.players = {
             player1_id: PlayerState(str(player1_id)), # Use ID as name for now
@@ -69,54 +164,50 @@ class ArcanaGame:
         """
         user_deck_file = f"config/decks/{user_id}.json"
         path_to_load = default_deck_path # Default
+        deck_mtime = None # Known already if we end up using the custom deck
         
+        # One stat gives us existence, size and mtime
+        try:
+            user_deck_stat = os.stat(user_deck_file)
+        except OSError:
+            user_deck_stat = None
+
         # Check if user deck exists and is not empty
-        if os.path.exists(user_deck_file) and os.path.getsize(user_deck_file) > 2: # > 2 to check if it's more than just "{}"
+        if user_deck_stat and user_deck_stat.st_size > 2: # > 2 to check if it's more than just "{}"
             try:
-                with open(user_deck_file, 'r') as f:
-                    deck_data = json.load(f)
-                    if deck_data.get("spirits") or deck_data.get("spells"):
-                        path_to_load = user_deck_file # Use custom deck
-                        print(f"Loading custom deck for user {user_id} from {user_deck_file}")
-                    else:
-                         print(f"Custom deck for {user_id} is empty. Loading default: {default_deck_path}")
+                deck_data = _load_deck_config(user_deck_file, user_deck_stat.st_mtime)
+                if deck_data.get("spirits") or deck_data.get("spells"):
+                    path_to_load = user_deck_file # Use custom deck
+                    deck_mtime = user_deck_stat.st_mtime
+                    log.debug("Loading custom deck for user %s from %s", user_id, user_deck_file)
+                else:
+                     log.debug("Custom deck for %s is empty. Loading default: %s", user_id, default_deck_path)
             except json.JSONDecodeError:
-                 print(f"Error reading custom deck for {user_id}. Loading default: {default_deck_path}")
+                 log.warning("Error reading custom deck for %s. Loading default: %s", user_id, default_deck_path)
         else:
-            # Don't print for bot user
-            if not str(user_id).isnumeric(): # Simple check if it's not a bot's name
-                 print(f"No custom deck for {user_id}. Loading default: {default_deck_path}")
+            log.debug("No custom deck for %s. Loading default: %s", user_id, default_deck_path)
 
 
         deck = []
-        if not os.path.exists(path_to_load):
-            print(f"Warning: Deck file not found for user {user_id} at {path_to_load}. Using empty deck.")
-            return deck
+        if deck_mtime is None:
+            try:
+                deck_mtime = os.path.getmtime(path_to_load)
+            except OSError:
+                log.warning("Deck file not found for user %s at %s. Using empty deck.", user_id, path_to_load)
+                return deck
 
         try:
-            with open(path_to_load, 'r') as f:
-                deck_config = json.load(f)
-
-            # Load spirits
-            for card_id, quantity in deck_config.get("spirits", {}).items():
-                for _ in range(quantity):
-                    card_instance = self.card_manager.create_card_instance(card_id)
-                    if card_instance:
-                        deck.append(card_instance)
-                    else:
-                        print(f"Warning: Card ID '{card_id}' in {path_to_load} not found in card library.")
-            
-            # Load spells
-            for card_id, quantity in deck_config.get("spells", {}).items():
-                for _ in range(quantity):
-                    card_instance = self.card_manager.create_card_instance(card_id)
-                    if card_instance:
-                        deck.append(card_instance)
-                    else:
-                        print(f"Warning: Card ID '{card_id}' in {path_to_load} not found in card library.")
+            # Spirits then spells, already validated
+            for card_id, quantity in _load_deck_entries(path_to_load, deck_mtime):
+                card_instance = self.card_manager.create_card_instance(card_id)
+                if card_instance:
+                    deck.append(card_instance)
+                    deck.extend(card_instance.clone() for _ in range(quantity - 1))
+                else:
+                    log.warning("Card ID '%s' in %s not found in card library.", card_id, path_to_load)
         
         except Exception as e:
-            print(f"Error loading deck from {path_to_load}: {e}")
+            log.error("Error loading deck from %s: %s", path_to_load, e)
 
         return deck
 
@@ -125,13 +216,13 @@ class ArcanaGame:
         Initializes player decks by loading their custom deck or the default.
         """
         # Player 1 (Challenger) uses their own deck or the default player_deck.json
-        self.players[self.player1_id].deck = self._load_deck_for_user(
+        self.players[self.player1_id].deck[:] = self._load_deck_for_user(
             self.player1_id, 
             "config/player_deck.json"
         )
         
         # Player 2 (Opponent) uses their own deck or the default npc_deck.json
-        self.players[self.player2_id].deck = self._load_deck_for_user(
+        self.players[self.player2_id].deck[:] = self._load_deck_for_user(
             self.player2_id, 
             "config/npc_deck.json" # Opponents use their own deck or the NPC default
         )
@@ -142,21 +233,20 @@ class ArcanaGame:
                 print(f"Warning: Player {player_id} has no deck (0 cards). Check config files.")
                 continue
 
-            random.shuffle(player.deck)
-            player.hand = [] # Ensure hand is empty
+            _batched_shuffle(player.deck)
+            player.clear_hand() # Ensure hand is empty
             draw_count = min(7, len(player.deck)) # Don't draw more than in deck
-            for _ in range(draw_count):
-                if player.deck:
-                    player.hand.append(player.deck.pop())
+            # Take the top cards in one slice; reversed so hand order matches drawing one at a time
+            drawn = player.deck[-draw_count:]
+            del player.deck[-draw_count:]
+            for card in reversed(drawn):
+                player.add_to_hand(card)
     
     def next_phase(self):
         if self.game_over:
             return
 
-        phases = list(Phase)
-        current_index = phases.index(self.current_phase)
-        
-        if current_index == len(phases) - 1:
+        if self.current_phase is _LAST_PHASE:
             # End of turn, switch players
             self.current_player_id = self.get_opponent_id(self.current_player_id)
             self.current_phase = Phase.ATTAINMENT
@@ -168,21 +258,22 @@ class ArcanaGame:
             self.handle_attunement_phase()
 
         else:
-            self.current_phase = phases[current_index + 1]
+            self.current_phase = _PHASE_NEXT[self.current_phase]
     
     def handle_attunement_phase(self):
         player = self.players[self.current_player_id]
         
         # Draw 1 card
         if player.deck:
-            player.hand.append(player.deck.pop())
+            player.add_to_hand(player.deck.pop())
         elif player.discard: # Reshuffle discard pile if deck is empty
             print(f"{player.name} reshuffling discard pile!")
-            player.deck = player.discard
-            player.discard = []
-            random.shuffle(player.deck)
+            # Move the discard pile into the (empty) deck in place, no new lists
+            player.deck.extend(player.discard)
+            player.discard.clear()
+            _batched_shuffle(player.deck)
             if player.deck:
-                player.hand.append(player.deck.pop())
+                player.add_to_hand(player.deck.pop())
         
         # Gain 2 Aether
         player.aether = min(player.aether + 2, player.max_aether)
@@ -193,7 +284,7 @@ class ArcanaGame:
     
     def get_opponent_id(self, player_id):
         """Returns the ID of the opponent."""
-        return self.player2_id if player_id == self.player1_id else self.player1_id
+        return self._opponent_of[player_id]
 
     def summon_spirit(self, player_id, spirit_name, slot_index):
         if self.current_phase != Phase.MEMORIZATION:
@@ -205,13 +296,7 @@ class ArcanaGame:
             return False, "Already placed a card this turn"
         
         # Find the spirit in hand
-        spirit_card = None
-        card_index_in_hand = -1
-        for i, card in enumerate(player.hand):
-            if card.type == "spirit" and card.name == spirit_name:
-                spirit_card = card
-                card_index_in_hand = i
-                break
+        spirit_card = player.find_in_hand("spirit", spirit_name)
         
         if not spirit_card:
             return False, f"No {spirit_name} in hand"
@@ -222,8 +307,9 @@ class ArcanaGame:
         if player.spirit_slots[slot_index] is not None:
             return False, "Spirit slot is occupied"
         
-        player.hand.pop(card_index_in_hand)
+        player.remove_from_hand(spirit_card)
         player.spirit_slots[slot_index] = spirit_card
+        player.spirits_alive += 1
         
         player.placed_card_this_turn = True
         return True, f"Summoned {spirit_name} to slot {slot_index + 1}"
@@ -238,13 +324,7 @@ class ArcanaGame:
             return False, "Already placed a card this turn"
 
         # Find the spell in hand
-        spell_card = None
-        card_index_in_hand = -1
-        for i, card in enumerate(player.hand):
-            if card.type == "spell" and card.name == spell_name:
-                spell_card = card
-                card_index_in_hand = i
-                break
+        spell_card = player.find_in_hand("spell", spell_name)
         
         if not spell_card:
             return False, f"No {spell_name} in hand"
@@ -255,10 +335,10 @@ class ArcanaGame:
         if len(player.spell_slots[slot_index]) >= 3:
             return False, "Spell slot is full (max 3)"
         
-        if player.spell_slots[slot_index] and player.spell_slots[slot_index][0].name != spell_name:
+        if player.spell_slots[slot_index] and player.spell_slots[slot_index][0].proto_id != spell_card.proto_id:
             return False, "Can only stack identical spells"
         
-        player.hand.pop(card_index_in_hand)
+        player.remove_from_hand(spell_card)
         player.spell_slots[slot_index].append(spell_card)
         
         player.placed_card_this_turn = True
@@ -275,13 +355,7 @@ class ArcanaGame:
             return False, "Already placed a card this turn"
 
         # Find the spell in hand
-        spell_card = None
-        card_index_in_hand = -1
-        for i, card in enumerate(player.hand):
-            if card.type == "spell" and card.name == spell_name:
-                spell_card = card
-                card_index_in_hand = i
-                break
+        spell_card = player.find_in_hand("spell", spell_name)
         
         if not spell_card:
             return False, f"No {spell_name} in hand"
@@ -297,7 +371,7 @@ class ArcanaGame:
                 player.discard.append(old_spell)
                 discard_count += 1
             
-        player.hand.pop(card_index_in_hand)
+        player.remove_from_hand(spell_card)
         player.spell_slots[slot_index] = [spell_card] # Start a new stack
         
         player.placed_card_this_turn = True
@@ -332,15 +406,17 @@ class ArcanaGame:
         if not (0 <= slot_index < len(player.spell_slots)):
             return False, "Invalid slot index"
         
-        if not player.spell_slots[slot_index]:
+        stack = player.spell_slots[slot_index]
+        if not stack:
             return False, "No spells in that slot"
+
+        if copies_used < 1:
+            return False, "Must use at least one copy"
         
-        if copies_used > len(player.spell_slots[slot_index]):
-            copies_used = len(player.spell_slots[slot_index])
-            if copies_used == 0:
-                return False, "No copies in stack."
+        if copies_used > len(stack):
+            copies_used = len(stack)
 
-        spell = player.spell_slots[slot_index][0]
+        spell = stack[0]
         total_cost = spell.activation_cost * copies_used
         
         if player.aether < total_cost:
@@ -349,51 +425,59 @@ class ArcanaGame:
         player.aether -= total_cost
         
         effect_applied = False
-        message = f"Activated {spell.name} x{copies_used}"
+        verbose = self.verbose
+        message = f"Activated {spell.name} x{copies_used}" if verbose else ""
 
         # --- Resolve spell effects using keywords ---
-        spell_effects = spell.effects
+        heal_wizard = spell.heal_wizard
+        heal_spirit = spell.heal_spirit
         message_parts = [message]
 
-        if spell_effects.get("aoe_damage") and spell_effects.get("target") == "enemy_spirits":
+        if spell.aoe_damage and spell.aoe_target is ENEMY_SPIRITS:
             damage = spell.scaling * copies_used
             targets_hit = 0
             for i, spirit in enumerate(opponent.spirit_slots):
                 if spirit:
                     targets_hit += 1
-                    actual_damage = max(0, damage - spirit.defense)
+                    actual_damage = damage - spirit.defense
+                    if actual_damage < 0:
+                        actual_damage = 0
                     spirit.current_hp -= actual_damage
-                    message_parts.append(f"{spirit.name} takes {actual_damage}")
+                    if verbose:
+                        message_parts.append(f"{spirit.name} takes {actual_damage}")
                     if spirit.current_hp <= 0:
                         opponent.discard.append(spirit)
                         opponent.spirit_slots[i] = None
-                        message_parts.append(f"{spirit.name} destroyed")
+                        opponent.spirits_alive -= 1
+                        if verbose:
+                            message_parts.append(f"{spirit.name} destroyed")
             
             effect_applied = True
-            if targets_hit == 0:
-                message = f"{spell.name} cast, but no enemy spirits."
-            else:
-                message = ", ".join(message_parts)
+            if verbose:
+                if targets_hit == 0:
+                    message = f"{spell.name} cast, but no enemy spirits."
+                else:
+                    message = ", ".join(message_parts)
         
-        elif spell_effects.get("heal_wizard"):
-            wizard_heal = spell_effects.get("heal_wizard", 0) * copies_used
+        elif heal_wizard:
+            wizard_heal = heal_wizard * copies_used
             player.wizard_hp = min(20, player.wizard_hp + wizard_heal)
-            message_parts = [f"Healed {wizard_heal} HP to your wizard"]
             
-            # Check for spirit heal on the same card
-            if spell_effects.get("heal_spirit"):
-                # TODO: Add targeting for healing spirits.
-                message_parts.append(f"({spell_effects.get('heal_spirit')} spirit heal not implemented)")
+            if verbose:
+                message_parts = [f"Healed {wizard_heal} HP to your wizard"]
+                # Check for spirit heal on the same card
+                if heal_spirit:
+                    # TODO: Add targeting for healing spirits.
+                    message_parts.append(f"({heal_spirit} spirit heal not implemented)")
+                message = ", ".join(message_parts)
 
             effect_applied = True
-            message = ", ".join(message_parts)
         
         # --- Finalize effect ---
         if effect_applied:
-            for _ in range(copies_used):
-                if player.spell_slots[slot_index]:
-                    discarded_spell = player.spell_slots[slot_index].pop()
-                    player.discard.append(discarded_spell)
+            # copies_used is already clamped to 1..len(stack), so move them in one slice
+            player.discard.extend(stack[-copies_used:])
+            del stack[-copies_used:]
         else:
             # Refund Aether if no effect was applied
             player.aether += total_cost
@@ -422,17 +506,17 @@ class ArcanaGame:
         
         # --- Target: Wizard ---
         if target_type == "wizard":
-            has_guard = any(opponent.spirit_slots)
+            has_guard = opponent.spirits_alive > 0
             # --- USE KEYWORD ---
-            can_attack_directly = spirit.effects.get("direct_attack", False)
+            can_attack_directly = spirit.direct_attack
 
             if has_guard and not can_attack_directly:
                 player.aether += spirit.activation_cost # Refund cost
                 return False, "Cannot attack wizard (Guard Rule)"
             
-            damage = max(0, spirit.power)
+            damage = spirit.power if spirit.power > 0 else 0
             opponent.wizard_hp -= damage
-            message = f"{spirit.name} attacked wizard for {damage} damage"
+            message = f"{spirit.name} attacked wizard for {damage} damage" if self.verbose else ""
             
             if opponent.wizard_hp <= 0:
                 opponent.wizard_hp = 0
@@ -450,29 +534,34 @@ class ArcanaGame:
                 player.aether += spirit.activation_cost # Refund cost
                 return False, "No spirit in target slot"
             
-            damage = max(0, spirit.power - target_spirit.defense)
+            damage = spirit.power - target_spirit.defense
+            if damage < 0:
+                damage = 0
             target_spirit.current_hp -= damage
             
-            message_parts = [f"{spirit.name} attacked {target_spirit.name} for {damage} damage"]
-            
             # --- Handle spirit effects using keywords ---
-            reduce_amount = spirit.effects.get("reduce_defense")
-            if reduce_amount:
-                # Check if target is immune
-                can_be_reduced = not target_spirit.effects.get("prevent_defense_reduction", False)
-                
-                if can_be_reduced:
-                    target_spirit.defense = max(0, target_spirit.defense - reduce_amount)
-                    message_parts.append(f"and reduced its defense by {reduce_amount}")
-                else:
-                    message_parts.append("but its defense cannot be reduced")
+            reduce_amount = spirit.reduce_defense
+            # Check if target is immune
+            reduced = reduce_amount and not target_spirit.prevent_defense_reduction
+            if reduced:
+                target_spirit.defense = max(0, target_spirit.defense - reduce_amount)
             
-            if target_spirit.current_hp <= 0:
+            destroyed = target_spirit.current_hp <= 0
+            if destroyed:
                 opponent.discard.append(target_spirit)
                 opponent.spirit_slots[target_index] = None
-                message_parts.append("and destroyed it")
+                opponent.spirits_alive -= 1
             
-            message = " ".join(message_parts)
+            message = ""
+            if self.verbose:
+                message_parts = [f"{spirit.name} attacked {target_spirit.name} for {damage} damage"]
+                if reduced:
+                    message_parts.append(f"and reduced its defense by {reduce_amount}")
+                elif reduce_amount:
+                    message_parts.append("but its defense cannot be reduced")
+                if destroyed:
+                    message_parts.append("and destroyed it")
+                message = " ".join(message_parts)
         
         else:
              player.aether += spirit.activation_cost # Refund cost
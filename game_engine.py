@@ -1,7 +1,9 @@
 import json
 import random
 import os
+import functools
 from enum import Enum
+from card_manager import Card, SPIRIT, SPELL, ENEMY_SPIRITS # Shared card definition
 
 
 class Phase(Enum):
@@ -10,51 +12,176 @@ class Phase(Enum):
     INVOCATION = "invocation"
     RESPITE = "respite"
 
-class Card:
-    # --- ADDED 'effects' PARAMETER ---
-    def __init__(self, name, card_type, activation_cost, power=0, defense=0, hp=0, effect="", scaling=0, element="", effects=None):
-        self.name = name
-        self.type = card_type  # "spirit" or "spell"
-        self.activation_cost = activation_cost
-        self.power = power
-        self.defense = defense
-        self.max_hp = hp
-        self.current_hp = hp
-        self.effect = effect # Keep for display
-        self.scaling = scaling
-        self.element = element
-        self.effects = effects if effects is not None else {}
+# Phase order, precomputed so next_phase doesn't rebuild and search a list every tick
+_PHASE_ORDER = tuple(Phase)
+_PHASE_NEXT = dict(zip(_PHASE_ORDER, _PHASE_ORDER[1:] + _PHASE_ORDER[:1]))
+_LAST_PHASE = _PHASE_ORDER[-1]
+
+_OPPONENT_OF = {"player": "npc", "npc": "player"}
+_WIZARD_MAX_HP = 20
+
+_MASK64 = (1 << 64) - 1
 
+def _batched_shuffle(cards, getrandbits=random.getrandbits):
+    """
+    In-place Fisher-Yates shuffle that gets two swap indexes out of each 64-bit draw
+    (Lemire's batched bounded-random method), instead of one PRNG call per swap.
+    Rejection on the leftover bits keeps every permutation equally likely.
+    """
+    i = len(cards)
+    while i > 2:
+        bound = i * (i - 1)
+        while True:
+            x = getrandbits(64) * i
+            idx1, leftover = x >> 64, x & _MASK64
+            x = leftover * (i - 1)
+            idx2, leftover = x >> 64, x & _MASK64
+            # Only draws whose leftover falls below 2**64 % bound are biased
+            if leftover >= bound or leftover >= (1 << 64) % bound:
+                break
+        cards[i - 1], cards[idx1] = cards[idx1], cards[i - 1]
+        cards[i - 2], cards[idx2] = cards[idx2], cards[i - 2]
+        i -= 2
+    if i == 2:
+        idx = getrandbits(1)
+        cards[1], cards[idx] = cards[idx], cards[1]
+
+@functools.lru_cache(maxsize=32)
+def _load_deck_entries(path, mtime):
+    """
+    Parses a deck file into a flat tuple of (card_id, quantity), spirits first then spells.
+    Cached on (path, mtime) so restarts reuse the parse; an edited file gets re-read.
+    """
+    with open(path, 'r') as f:
+        deck_config = json.load(f)
+    entries = []
+    for section in ("spirits", "spells"):
+        for card_id, quantity in deck_config.get(section, {}).items():
+            if not isinstance(quantity, int) or quantity <= 0:
+                print(f"Warning: Ignoring '{card_id}' in {path} (invalid quantity {quantity!r}).")
+                continue
+            entries.append((card_id, quantity))
+    return tuple(entries)
 
 class PlayerState:
+    __slots__ = ("name", "wizard_hp", "aether", "max_aether", "hand", "hand_by_type", "hand_index", "_hand_pos",
+                 "deck", "discard", "spirit_slots", "spirits_alive", "spell_slots",
+                 "wizard_ability_used", "placed_card_this_turn")
+
     def __init__(self, name):
         self.name = name
-        self.wizard_hp = 20
+        self.wizard_hp = _WIZARD_MAX_HP
         self.aether = 0
         self.max_aether = 16
         self.hand = []
+        self.hand_by_type = {SPIRIT: [], SPELL: []} # Same cards as hand, bucketed by type
+        self.hand_index = {} # (type, name) -> cards in hand with that type and name
+        self._hand_pos = {} # card -> its position in hand, for O(1) removal
         self.deck = []
         self.discard = []
         self.spirit_slots = [None, None, None]  # 3 slots
+        self.spirits_alive = 0 # Occupied spirit slots, kept in step with spirit_slots
         self.spell_slots = [[], [], [], []]     # 4 slots, each can hold a stack
         self.wizard_ability_used = False
         self.placed_card_this_turn = False
 
+    def gain_aether(self, amount):
+        """Adds Aether, capped at max_aether."""
+        aether = self.aether + amount
+        max_aether = self.max_aether
+        self.aether = aether if aether < max_aether else max_aether
+
+    def add_to_hand(self, card):
+        """Adds a card to the hand, keeping the type buckets and name index in sync."""
+        self._hand_pos[card] = len(self.hand)
+        self.hand.append(card)
+        self.hand_by_type[card.type].append(card)
+        self.hand_index.setdefault((card.type, card.name), []).append(card)
+
+    def remove_from_hand(self, card):
+        """
+        Removes a card from the hand, keeping the type buckets and name index in sync.
+        The last card in hand is swapped into the freed position, so hand order isn't preserved.
+        """
+        pos = self._hand_pos.pop(card)
+        last = self.hand.pop()
+        if last is not card:
+            self.hand[pos] = last
+            self._hand_pos[last] = pos
+        self.hand_by_type[card.type].remove(card)
+        key = (card.type, card.name)
+        same_cards = self.hand_index[key]
+        same_cards.remove(card)
+        if not same_cards:
+            del self.hand_index[key]
+
+    def find_in_hand(self, card_type, name):
+        """Returns the first card in hand with this type and name, or None."""
+        same_cards = self.hand_index.get((card_type, name))
+        return same_cards[0] if same_cards else None
+
+    def clear_hand(self):
+        self.hand = []
+        self.hand_by_type = {SPIRIT: [], SPELL: []}
+        self.hand_index = {}
+        self._hand_pos = {}
+
+    def reset(self):
+        """Puts the player back to the start-of-game state with empty zones."""
+        self.wizard_hp = _WIZARD_MAX_HP
+        self.aether = 0
+        self.clear_hand()
+        self.deck.clear()
+        self.discard.clear()
+        self.spirit_slots[:] = (None, None, None)
+        self.spirits_alive = 0
+        for spell_stack in self.spell_slots:
+            spell_stack.clear()
+        self.wizard_ability_used = False
+        self.placed_card_this_turn = False
+
 class ArcanaGame:
-    def __init__(self, card_manager):
+    def __init__(self, card_manager, verbose=True, seed=None):
+        # When False, successful actions return an empty message instead of building one
+        # (for AI-only games where nobody reads them). Failure messages are always returned.
+        self.verbose = verbose
+        # Shuffles draw from a per-game generator when seeded, so balance runs can be replayed
+        self._getrandbits = random.Random(seed).getrandbits if seed is not None else random.getrandbits
         self.players = {
             "player": PlayerState("player"),
             "npc": PlayerState("npc")
         }
+        # Player name -> the other side's state, so actions skip the name lookup
+        self._opponent_state = {name: self.players[_OPPONENT_OF[name]] for name in self.players}
         self.current_player = "player"
         self.current_phase = Phase.ATTAINMENT
         self.turn_count = 1
         self.game_over = False
         self.winner = None
         self.card_manager = card_manager
+        self._npc_ai = None # Created on the first execute_npc_turn
         
         # Load decks from JSON files
         self.initialize_decks()
+
+    def reset(self):
+        """
+        Starts a new game on this object, keeping the players, the RNG and the NPC controller.
+        Decks are reloaded rather than recollected, since spirits come back from play damaged.
+        """
+        for player in self.players.values():
+            player.reset()
+        self.current_player = "player"
+        self.current_phase = Phase.ATTAINMENT
+        self.turn_count = 1
+        self.game_over = False
+        self.winner = None
+        self.initialize_decks()
+
+    @classmethod
+    def headless(cls, card_manager, seed=None):
+        """A game for simulations and AI-vs-AI runs; skips building result messages."""
+        return cls(card_manager, verbose=False, seed=seed)
     
     def _load_deck_from_file(self, file_path):
         """
@@ -62,33 +189,22 @@ class ArcanaGame:
         and returns them as a list.
         """
         deck = []
-        if not os.path.exists(file_path):
+        try:
+            deck_mtime = os.path.getmtime(file_path)
+        except OSError:
             print(f"Warning: Deck file not found: {file_path}")
             return deck
 
         try:
-            with open(file_path, 'r') as f:
-                deck_config = json.load(f)
-
-            # Load spirits
-            for card_id, quantity in deck_config.get("spirits", {}).items():
-                for _ in range(quantity):
-                    # Use the card manager to create a full card instance from the ID
-                    card_instance = self.card_manager.create_card_instance(card_id)
-                    if card_instance:
-                        deck.append(card_instance)
-                    else:
-                        print(f"Warning: Card ID '{card_id}' not found in card library.")
-            
-            # Load spells
-            for card_id, quantity in deck_config.get("spells", {}).items():
-                for _ in range(quantity):
-                    # Use the card manager to create a full card instance from the ID
-                    card_instance = self.card_manager.create_card_instance(card_id)
-                    if card_instance:
-                        deck.append(card_instance)
-                    else:
-                        print(f"Warning: Card ID '{card_id}' not found in card library.")
+            # Spirits then spells
+            for card_id, quantity in _load_deck_entries(file_path, deck_mtime):
+                # Use the card manager to create a full card instance from the ID
+                card_instance = self.card_manager.create_card_instance(card_id)
+                if card_instance:
+                    deck.append(card_instance)
+                    deck.extend(card_instance.clone() for _ in range(quantity - 1))
+                else:
+                    print(f"Warning: Card ID '{card_id}' not found in card library.")
         
         except Exception as e:
             print(f"Error loading deck from {file_path}: {e}")
@@ -104,8 +220,8 @@ class ArcanaGame:
         npc_deck_file = "config/npc_deck.json"
 
         # Load decks
-        self.players["player"].deck = self._load_deck_from_file(player_deck_file)
-        self.players["npc"].deck = self._load_deck_from_file(npc_deck_file)
+        self.players["player"].deck[:] = self._load_deck_from_file(player_deck_file)
+        self.players["npc"].deck[:] = self._load_deck_from_file(npc_deck_file)
         
         # Shuffle and draw starting hands
         for player in self.players.values():
@@ -113,22 +229,22 @@ class ArcanaGame:
                 print(f"Warning: {player.name} has no deck. Did you create the .json file?")
                 continue
 
-            random.shuffle(player.deck)
-            player.hand = [] # Ensure hand is empty
-            for _ in range(7):
-                if player.deck:
-                    player.hand.append(player.deck.pop())
+            _batched_shuffle(player.deck, self._getrandbits)
+            player.clear_hand() # Ensure hand is empty
+            draw_count = min(7, len(player.deck))
+            # Take the top cards in one slice; reversed so hand order matches drawing one at a time
+            drawn = player.deck[-draw_count:]
+            del player.deck[-draw_count:]
+            for card in reversed(drawn):
+                player.add_to_hand(card)
     
     def next_phase(self):
         if self.game_over:
             return
 
-        phases = list(Phase)
-        current_index = phases.index(self.current_phase)
-        
-        if current_index == len(phases) - 1:
+        if self.current_phase is _LAST_PHASE:
             # End of turn, switch players
-            self.current_player = "npc" if self.current_player == "player" else "player"
+            self.current_player = _OPPONENT_OF[self.current_player]
             self.current_phase = Phase.ATTAINMENT
             if self.current_player == "player":
                 self.turn_count += 1
@@ -137,34 +253,36 @@ class ArcanaGame:
             self.handle_attunement_phase()
 
         else:
-            self.current_phase = phases[current_index + 1]
+            self.current_phase = _PHASE_NEXT[self.current_phase]
     
     def handle_attunement_phase(self):
         player = self.players[self.current_player]
         
         # Draw 1 card
         if player.deck:
-            player.hand.append(player.deck.pop())
+            player.add_to_hand(player.deck.pop())
         elif player.discard: # Reshuffle discard pile if deck is empty
-            print(f"{player.name} reshuffling discard pile!")
-            player.deck = player.discard
-            player.discard = []
-            random.shuffle(player.deck)
-            if player.deck:
-                player.hand.append(player.deck.pop())
+            if self.verbose:
+                print(f"{player.name} reshuffling discard pile!")
+            # Move the discard pile into the (empty) deck in place, no new lists
+            deck = player.deck
+            deck.extend(player.discard)
+            player.discard.clear()
+            _batched_shuffle(deck, self._getrandbits)
+            player.add_to_hand(deck.pop())
         
         # Gain 2 Aether
-        player.aether = min(player.aether + 2, player.max_aether)
+        player.gain_aether(2)
         
         # --- Reset turn flags ---
         player.wizard_ability_used = False
         player.placed_card_this_turn = False
     
     def get_opponent_name(self, player_name):
-        return "npc" if player_name == "player" else "player"
+        return _OPPONENT_OF[player_name]
 
     def summon_spirit(self, player_name, spirit_name, slot_index):
-        if self.current_phase != Phase.MEMORIZATION:
+        if self.current_phase is not Phase.MEMORIZATION:
             return False, "Can only summon during memorization phase"
         
         player = self.players[player_name]
@@ -174,13 +292,7 @@ class ArcanaGame:
             return False, "Already placed a card this turn"
         
         # Find the spirit in hand
-        spirit_card = None
-        card_index_in_hand = -1
-        for i, card in enumerate(player.hand):
-            if card.type == "spirit" and card.name == spirit_name:
-                spirit_card = card
-                card_index_in_hand = i
-                break
+        spirit_card = player.find_in_hand(SPIRIT, spirit_name)
         
         if not spirit_card:
             return False, f"No {spirit_name} in hand"
@@ -189,15 +301,16 @@ class ArcanaGame:
         if player.spirit_slots[slot_index] is not None:
             return False, "Spirit slot is occupied"
         
-        # Remove from hand (using index) and place in slot
-        player.hand.pop(card_index_in_hand)
+        # Remove from hand and place in slot
+        player.remove_from_hand(spirit_card)
         player.spirit_slots[slot_index] = spirit_card
+        player.spirits_alive += 1
         
         player.placed_card_this_turn = True
         return True, f"Summoned {spirit_name} to slot {slot_index + 1}"
     
     def prepare_spell(self, player_name, spell_name, slot_index):
-        if self.current_phase != Phase.MEMORIZATION:
+        if self.current_phase is not Phase.MEMORIZATION:
             return False, "Can only prepare spells during memorization phase"
         
         player = self.players[player_name]
@@ -207,35 +320,30 @@ class ArcanaGame:
             return False, "Already placed a card this turn"
 
         # Find the spell in hand
-        spell_card = None
-        card_index_in_hand = -1
-        for i, card in enumerate(player.hand):
-            if card.type == "spell" and card.name == spell_name:
-                spell_card = card
-                card_index_in_hand = i
-                break
+        spell_card = player.find_in_hand(SPELL, spell_name)
         
         if not spell_card:
             return False, f"No {spell_name} in hand"
         
+        stack = player.spell_slots[slot_index]
         # Check if we can add to stack (max 3)
-        if len(player.spell_slots[slot_index]) >= 3:
+        if len(stack) >= 3:
             return False, "Spell slot is full (max 3)"
         
         # Check if adding to existing stack, must be same spell
-        if player.spell_slots[slot_index] and player.spell_slots[slot_index][0].name != spell_name:
+        if stack and stack[0].proto_id != spell_card.proto_id:
             return False, "Can only stack identical spells"
         
         # Remove from hand and add to slot
-        player.hand.pop(card_index_in_hand)
-        player.spell_slots[slot_index].append(spell_card)
+        player.remove_from_hand(spell_card)
+        stack.append(spell_card)
         
         player.placed_card_this_turn = True
         return True, f"Prepared {spell_name} in slot {slot_index + 1}"
 
     def replace_spell(self, player_name, spell_name, slot_index):
         """Discards an entire spell stack and replaces it with a new spell from hand."""
-        if self.current_phase != Phase.MEMORIZATION:
+        if self.current_phase is not Phase.MEMORIZATION:
             return False, "Can only replace spells during memorization phase"
         
         player = self.players[player_name]
@@ -245,13 +353,7 @@ class ArcanaGame:
             return False, "Already placed a card this turn"
 
         # Find the spell in hand
-        spell_card = None
-        card_index_in_hand = -1
-        for i, card in enumerate(player.hand):
-            if card.type == "spell" and card.name == spell_name:
-                spell_card = card
-                card_index_in_hand = i
-                break
+        spell_card = player.find_in_hand(SPELL, spell_name)
         
         if not spell_card:
             return False, f"No {spell_name} in hand"
@@ -262,14 +364,11 @@ class ArcanaGame:
             
         # Discard all cards currently in that slot
         old_stack = player.spell_slots[slot_index]
-        discard_count = 0
-        if old_stack:
-            for old_spell in old_stack:
-                player.discard.append(old_spell)
-                discard_count += 1
+        discard_count = len(old_stack)
+        player.discard.extend(old_stack)
             
         # Remove from hand and place in slot
-        player.hand.pop(card_index_in_hand)
+        player.remove_from_hand(spell_card)
         player.spell_slots[slot_index] = [spell_card] # Start a new stack
         
         player.placed_card_this_turn = True
@@ -277,7 +376,7 @@ class ArcanaGame:
 
     def use_wizard_ability(self, player_name):
         """Uses the player's wizard ability (stubbed)."""
-        if self.current_phase != Phase.MEMORIZATION:
+        if self.current_phase is not Phase.MEMORIZATION:
             return False, "Can only use ability during memorization phase"
         
         player = self.players[player_name]
@@ -290,29 +389,31 @@ class ArcanaGame:
         
         # TODO: Implement ability logic
         # For now, just mark as used and give 1 Aether
-        player.aether = min(player.aether + 1, player.max_aether)
+        player.gain_aether(1)
         player.wizard_ability_used = True
         player.placed_card_this_turn = True
         return True, "Wizard ability used! (Gained 1 Aether)"
 
     def activate_spell(self, player_name, slot_index, copies_used):
-        if self.current_phase != Phase.INVOCATION:
+        if self.current_phase is not Phase.INVOCATION:
             return False, "Can only activate spells during invocation phase"
         
         player = self.players[player_name]
-        opponent = self.players[self.get_opponent_name(player_name)]
+        opponent = self._opponent_state[player_name]
         
         # Check if slot has spells
-        if not player.spell_slots[slot_index]:
+        stack = player.spell_slots[slot_index]
+        if not stack:
             return False, "No spells in that slot"
+
+        if copies_used < 1:
+            return False, "Must use at least one copy"
         
         # Check if we're trying to use more copies than available
-        if copies_used > len(player.spell_slots[slot_index]):
-            copies_used = len(player.spell_slots[slot_index]) # Use max available if over
-            if copies_used == 0:
-                return False, "No copies in stack."
+        if copies_used > len(stack):
+            copies_used = len(stack) # Use max available if over
 
-        spell = player.spell_slots[slot_index][0]
+        spell = stack[0]
         total_cost = spell.activation_cost * copies_used
         
         # Check if player has enough Aether
@@ -324,51 +425,63 @@ class ArcanaGame:
         
         # Resolve effect based on spell name
         effect_applied = False
-        message = f"Activated {spell.name} x{copies_used}"
+        verbose = self.verbose
+        message = f"Activated {spell.name} x{copies_used}" if verbose else ""
 
         # --- Resolve spell effects using keywords ---
-        spell_effects = spell.effects
+        heal_wizard = spell.heal_wizard
+        heal_spirit = spell.heal_spirit
         message_parts = [message]
 
-        if spell_effects.get("aoe_damage") and spell_effects.get("target") == "enemy_spirits":
+        if spell.aoe_damage and spell.aoe_target is ENEMY_SPIRITS:
             damage = spell.scaling * copies_used
             targets_hit = 0
-            for i, spirit in enumerate(opponent.spirit_slots):
+            enemy_slots = opponent.spirit_slots
+            enemy_discard = opponent.discard
+            for i, spirit in enumerate(enemy_slots):
                 if spirit:
                     targets_hit += 1
-                    actual_damage = max(0, damage - spirit.defense)
-                    spirit.current_hp -= actual_damage
-                    message_parts.append(f"{spirit.name} takes {actual_damage}")
-                    if spirit.current_hp <= 0:
-                        opponent.discard.append(spirit)
-                        opponent.spirit_slots[i] = None
-                        message_parts.append(f"{spirit.name} destroyed")
+                    actual_damage = damage - spirit.defense
+                    if actual_damage < 0:
+                        actual_damage = 0
+                    hp = spirit.current_hp - actual_damage
+                    spirit.current_hp = hp
+                    if verbose:
+                        message_parts.append(f"{spirit.name} takes {actual_damage}")
+                    if hp <= 0:
+                        enemy_discard.append(spirit)
+                        enemy_slots[i] = None
+                        opponent.spirits_alive -= 1
+                        if verbose:
+                            message_parts.append(f"{spirit.name} destroyed")
             
             effect_applied = True
-            if targets_hit == 0:
-                message = f"{spell.name} cast, but no enemy spirits."
-            else:
-                message = ", ".join(message_parts)
+            if verbose:
+                if targets_hit == 0:
+                    message = f"{spell.name} cast, but no enemy spirits."
+                else:
+                    message = ", ".join(message_parts)
         
-        elif spell_effects.get("heal_wizard"):
-            wizard_heal = spell_effects.get("heal_wizard", 0) * copies_used
-            player.wizard_hp = min(20, player.wizard_hp + wizard_heal)
-            message_parts = [f"Healed {wizard_heal} HP to your wizard"]
+        elif heal_wizard:
+            wizard_heal = heal_wizard * copies_used
+            healed_hp = player.wizard_hp + wizard_heal
+            player.wizard_hp = healed_hp if healed_hp < _WIZARD_MAX_HP else _WIZARD_MAX_HP
             
-            # Check for spirit heal on the same card
-            if spell_effects.get("heal_spirit"):
-                # TODO: Add targeting for healing spirits.
-                message_parts.append(f"({spell_effects.get('heal_spirit')} spirit heal not implemented)")
+            if verbose:
+                message_parts = [f"Healed {wizard_heal} HP to your wizard"]
+                # Check for spirit heal on the same card
+                if heal_spirit:
+                    # TODO: Add targeting for healing spirits.
+                    message_parts.append(f"({heal_spirit} spirit heal not implemented)")
+                message = ", ".join(message_parts)
 
             effect_applied = True
-            message = ", ".join(message_parts)
         
         # Remove used copies from the stack
         if effect_applied:
-            for _ in range(copies_used):
-                if player.spell_slots[slot_index]: # Check if stack is not empty
-                    discarded_spell = player.spell_slots[slot_index].pop()
-                    player.discard.append(discarded_spell)
+            # copies_used is already clamped to 1..len(stack), so move them in one slice
+            player.discard.extend(stack[-copies_used:])
+            del stack[-copies_used:]
         else:
             # If effect failed (e.g., no valid target), refund Aether
             player.aether += total_cost
@@ -377,11 +490,11 @@ class ArcanaGame:
         return effect_applied, message
     
     def attack_with_spirit(self, player_name, spirit_slot_index, target_type, target_index=None):
-        if self.current_phase != Phase.INVOCATION:
+        if self.current_phase is not Phase.INVOCATION:
             return False, "Can only attack during invocation phase"
         
         player = self.players[player_name]
-        opponent = self.players[self.get_opponent_name(player_name)]
+        opponent = self._opponent_state[player_name]
         
         # Get attacking spirit
         spirit = player.spirit_slots[spirit_slot_index]
@@ -398,9 +511,9 @@ class ArcanaGame:
         # Determine target
         if target_type == "wizard":
             # Check Guard Rule
-            has_guard = any(opponent.spirit_slots)
+            has_guard = opponent.spirits_alive > 0
             # --- USE KEYWORD ---
-            can_attack_directly = spirit.effects.get("direct_attack", False)
+            can_attack_directly = spirit.direct_attack
 
             if has_guard and not can_attack_directly:
                 # Refund cost if attack fails
@@ -410,7 +523,7 @@ class ArcanaGame:
             # Attack wizard
             damage = max(0, spirit.power)  # Wizard has 0 defense
             opponent.wizard_hp -= damage
-            message = f"{spirit.name} attacked wizard for {damage} damage"
+            message = f"{spirit.name} attacked wizard for {damage} damage" if self.verbose else ""
             
             # Check for win condition
             if opponent.wizard_hp <= 0:
@@ -431,34 +544,45 @@ class ArcanaGame:
                 return False, "No spirit in target slot"
             
             # Calculate damage
-            damage = max(0, spirit.power - target_spirit.defense)
-            target_spirit.current_hp -= damage
-            
-            message_parts = [f"{spirit.name} attacked {target_spirit.name} for {damage} damage"]
+            target_defense = target_spirit.defense
+            damage = spirit.power - target_defense
+            if damage < 0:
+                damage = 0
+            target_hp = target_spirit.current_hp - damage
+            target_spirit.current_hp = target_hp
             
             # --- Handle spirit effects using keywords ---
-            reduce_amount = spirit.effects.get("reduce_defense")
-            if reduce_amount:
-                # Check if target is immune
-                can_be_reduced = not target_spirit.effects.get("prevent_defense_reduction", False)
-                
-                if can_be_reduced:
-                    target_spirit.defense = max(0, target_spirit.defense - reduce_amount)
-                    message_parts.append(f"and reduced its defense by {reduce_amount}")
-                else:
-                    message_parts.append("but its defense cannot be reduced")
+            reduce_amount = spirit.reduce_defense
+            # Check if target is immune
+            reduced = reduce_amount and not target_spirit.prevent_defense_reduction
+            if reduced:
+                target_defense -= reduce_amount
+                target_spirit.defense = target_defense if target_defense > 0 else 0
             
             # Check if target died
-            if target_spirit.current_hp <= 0:
+            destroyed = target_hp <= 0
+            if destroyed:
                 opponent.discard.append(target_spirit)
                 opponent.spirit_slots[target_index] = None
-                message_parts.append("and destroyed it")
+                opponent.spirits_alive -= 1
             
-            message = " ".join(message_parts)
+            message = ""
+            if self.verbose:
+                # At most three clauses, so build the string directly rather than joining a list
+                if reduced:
+                    effect_text = f" and reduced its defense by {reduce_amount}"
+                elif reduce_amount:
+                    effect_text = " but its defense cannot be reduced"
+                else:
+                    effect_text = ""
+                message = (f"{spirit.name} attacked {target_spirit.name} for {damage} damage"
+                           f"{effect_text}{' and destroyed it' if destroyed else ''}")
         
         return True, message
     
     def execute_npc_turn(self):
-        from ai_controller import AIController
-        ai = AIController()
-        ai.execute_ai_turn(self)
\ No newline at end of file
+        if self._npc_ai is None:
+            # Imported here because ai_controller imports Phase from this module
+            from ai_controller import AIController
+            self._npc_ai = AIController()
+        self._npc_ai.execute_ai_turn(self)
\ No newline at end of file
@@ -2,10 +2,36 @@
 # PyGame vizualization and input loop
 import pygame
 import sys
+from collections import OrderedDict
 from game_engine import ArcanaGame, Phase
-from card_manager import CardManager
+from card_manager import CardManager, SPIRIT, SPELL
 from ai_controller import AIController
 
+# The phases the key handlers check, bound once instead of looked up on Phase for every key press
+_MEMORIZATION = Phase.MEMORIZATION
+_INVOCATION = Phase.INVOCATION
+
+# Keycode -> digit for the number row and the keypad (keypad codes are not contiguous)
+_NUM_KEYS = {getattr(pygame, f"K_{i}"): i for i in range(10)}
+_NUM_KEYS.update({getattr(pygame, f"K_KP{i}"): i for i in range(10)})
+
+# Templates for the slot, track and hand labels, filled in by ArcanaVisualizer.label()
+_LABEL_FORMATS = {
+    "spirit": "[{}] {}",
+    "spirit_hp": "HP: {}/{}",
+    "spirit_stats": "P:{} D:{}",
+    "spirit_cost": "Cost:{}",
+    "spell": "[{}] {} x{}",
+    "spell_cost": "Cost: {}",
+    "empty_spirit": "Spirit [{}]",
+    "empty_spell": "Spell [{}]",
+    "wizard_hp": "HP: {}/20",
+    "npc_hp": "NPC HP: {}/20",
+    "aether": "Aether: {}/16",
+    "hand_card": "[{}] {} ({})",
+    "phase": "Turn {} - {} - Phase: {}",
+}
+
 class ArcanaVisualizer:
     def __init__(self):
         pygame.init()
@@ -13,8 +39,15 @@ class ArcanaVisualizer:
         self.screen_height = 900
         self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
         pygame.display.set_caption("Arcana Simulator")
-        self.clock = pygame.time.Clock()
+        # Only keys, quit and window exposure matter; let SDL drop mouse/motion events before they become Python objects
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed((pygame.QUIT, pygame.KEYDOWN, pygame.VIDEOEXPOSE))
         self.font = pygame.font.SysFont('Noto-Sans', 18, bold=False, italic=False)
+        self._text_cache = OrderedDict() # (text, color) -> rendered Surface, least recently used first
+        self._label_cache = {} # (kind, *values) -> formatted label
+        self._wrap_cache = {} # (text, max_width) -> wrapped lines
+        self._blit_queue = [] # (surface, dest) pairs collected by draw_text, flushed once per frame
+        self._fblits = getattr(self.screen, "fblits", None) # pygame-ce only: a tighter C loop than blits(), same result
         
         # --- Create CardManager first ---
         self.card_manager = CardManager()
@@ -22,6 +55,7 @@ class ArcanaVisualizer:
         self.game = ArcanaGame(self.card_manager) 
         
         self.ai = AIController()
+        self._ai_turn_at = None # pygame.time.get_ticks() at which the pending NPC turn runs
         self.last_message = "Welcome to Arcana! Your turn."
 
         # Color scheme
@@ -38,11 +72,39 @@ class ArcanaVisualizer:
             'highlight': (255, 255, 0), # Yellow for selection
         }
 
+        # Slot positions never change; work them out once for the background and every frame
+        self.compute_layout()
+
+        # Board background, slot frames and center line never change, so draw them once
+        self._static_bg = self.build_static_background()
+        self._drawn_state = None # board_state() of the frame currently on screen
+        self._frame_rects = [] # Areas this frame draws over the background
+        self._presented_rects = None # Same for the frame on screen; None when the whole window needs presenting
+        self._hand_panel_key = None # (hand cards, highlighted type) that _hand_panel was rendered for
+        self._hand_panel = None
+        self._log_panel_message = None # last_message that _log_panel was rendered for
+        self._log_panel = None
+        # Shown whenever there is no prompt; the text never changes
+        self._commands_surface = self.font.render(
+            "Actions: [1]Summon [2]Prepare [3]Activate [4]Attack [5]End Phase [R]New Game", True, self.colors['text']
+        ).convert_alpha(self.screen)
+
         # --- NEW: State machine for player input ---
         self.input_mode = "NORMAL" # "NORMAL", "SUMMON_CARD", "SUMMON_SLOT", "PREPARE_CARD", "PREPARE_SLOT", etc.
         self.selected_card = None
         self.selected_slot = None
         self.action_prompt = "" # Will show messages like "Select a Spirit card from hand [1-9]"
+        # Input mode -> handler for a key press in that mode
+        self._mode_handlers = {
+            "NORMAL": self._on_normal_key,
+            "SUMMON_CARD": self._on_summon_card_key,
+            "SUMMON_SLOT": self._on_summon_slot_key,
+            "PREPARE_CARD": self._on_prepare_card_key,
+            "PREPARE_SLOT": self._on_prepare_slot_key,
+            "ACTIVATE_SLOT": self._on_activate_slot_key,
+            "ATTACK_SLOT": self._on_attack_slot_key,
+            "ATTACK_TARGET": self._on_attack_target_key,
+        }
 
     def reset_input_state(self):
         """Helper to cancel actions and return to normal."""
@@ -56,205 +118,387 @@ class ArcanaVisualizer:
         total_width = (num_slots * slot_width) + ((num_slots - 1) * gap)
         return (self.screen_width - total_width) // 2
 
-    def draw_board(self):
-        self.screen.fill(self.colors['background'])
-
-        # Draw Center Line (Optional visual guide)
-        pygame.draw.line(self.screen, (50, 50, 60), (0, self.screen_height // 2), (self.screen_width, self.screen_height // 2), 2)
-
-        # Draw Player Side
-        self.draw_player_side()
+    def compute_layout(self):
+        """Fills self._slot_rects (row name -> slot Rects, left to right) and the matching highlight outlines."""
+        slot_width = 160
+        gap = 30
+        spirit_x_start = self.get_centered_start_x(3, slot_width, gap)
+        spell_x_start = self.get_centered_start_x(4, slot_width, gap)
 
-        # Draw NPC Side
-        self.draw_npc_side()
+        self._slot_rects = {}
+        # Spell rows are furthest from the center line, spirit rows closest to it
+        for row, y, x_start, count, slot_height in (("npc_spell", 100, spell_x_start, 4, 120), ("npc_spirit", 240, spirit_x_start, 3, 130),
+                                                    ("player_spirit", 500, spirit_x_start, 3, 130), ("player_spell", 660, spell_x_start, 4, 120)):
+            self._slot_rects[row] = [pygame.Rect(x_start + i * (slot_width + gap), y, slot_width, slot_height) for i in range(count)]
+        # Highlights are a 3px outline around the slot
+        self._highlight_rects = {row: [rect.inflate(6, 6) for rect in rects] for row, rects in self._slot_rects.items()}
 
-        # Draw turn info
-        self.draw_game_info()
+    def build_static_background(self):
+        """Pre-composes the parts of the board that look the same every frame."""
+        background = pygame.Surface((self.screen_width, self.screen_height)).convert(self.screen)
+        background.fill(self.colors['background'])
 
-        # Draw Game Over
-        if self.game.game_over:
-            self.draw_text(f"GAME OVER - {self.game.winner.upper()} WINS!", self.screen_width // 2 - 150, self.screen_height // 2 - 20, color=self.colors['game_over'])
-            self.draw_text("Press [R] to play again", self.screen_width // 2 - 100, self.screen_height // 2 + 10, color=self.colors['game_over'])
+        # Draw Center Line (Optional visual guide)
+        pygame.draw.line(background, (50, 50, 60), (0, self.screen_height // 2), (self.screen_width, self.screen_height // 2), 2)
+
+        rows = (("npc_spell", 'npc_slots', "empty_spell"), ("npc_spirit", 'npc_slots', "empty_spirit"),
+                ("player_spirit", 'player_slots', "empty_spirit"), ("player_spell", 'player_slots', "empty_spell"))
+        for row, color, _ in rows:
+            for rect in self._slot_rects[row]:
+                pygame.draw.rect(background, self.colors[color], rect, border_radius=5)
+
+        # Empty slots just show their label, so bake those in too. Occupied slots cover it
+        # with a blank copy of their row's slot, taken before the labels go on.
+        self._blank_slots = {} # row name -> Surface of an empty, unlabeled slot
+        for row, _, name in rows:
+            rects = self._slot_rects[row]
+            self._blank_slots[row] = background.subsurface(rects[0]).copy()
+            for i, rect in enumerate(rects):
+                background.blit(self.font.render(self.label(name, i+1), True, self.colors['text']), (rect.x+5, rect.y+5))
+
+        # HP and Aether tracks (NPC at the top, player at the bottom)
+        for y in (40, 780):
+            pygame.draw.rect(background, self.colors['hp_track'], (50, y, 200, 30))
+            pygame.draw.rect(background, self.colors['aether_track'], (300, y, 200, 30))
+
+        # Hand list title (the list itself changes, see draw_player_side)
+        background.blit(self.font.render("Player Hand:", True, self.colors['text']), (1200, 500))
+
+        return background
+
+    def board_state(self):
+        """Returns a snapshot of everything draw_board puts on screen; equal snapshots draw identical frames."""
+        game = self.game
+        sides = []
+        for player in (game.players["player"], game.players["npc"]):
+            spirits = tuple(
+                (spirit.proto_id, spirit.current_hp, spirit.power, spirit.defense) if spirit else None
+                for spirit in player.spirit_slots
+            )
+            spells = tuple((stack[0].proto_id, len(stack)) if stack else None for stack in player.spell_slots)
+            sides.append((player.wizard_hp, player.aether, spirits, spells))
+        return (
+            tuple(sides), tuple(game.players["player"].hand),
+            game.turn_count, game.current_player, game.current_phase, game.game_over, game.winner,
+            self.input_mode, self.selected_card, self.action_prompt, self.last_message,
+        )
 
-        pygame.display.flip()
+    def draw_board(self):
+        # Most frames in a turn-based game are pixel-identical; only repaint when something changed
+        state = self.board_state()
+        if state == self._drawn_state:
+            return
+        self._drawn_state = state
+
+        self.screen.blit(self._static_bg, (0, 0))
+
+        # The helpers below only draw rects directly (text is queued), so hold one lock
+        # for all of them instead of letting each pygame.draw call take its own.
+        # Blits need the surface unlocked again.
+        self.screen.lock()
+        try:
+            # Draw Player Side
+            self.draw_player_side()
+
+            # Draw NPC Side
+            self.draw_npc_side()
+
+            # Draw turn info
+            self.draw_game_info()
+
+            # Draw Game Over
+            if self.game.game_over:
+                self.draw_text(f"GAME OVER - {self.game.winner.upper()} WINS!", self.screen_width // 2 - 150, self.screen_height // 2 - 20, color=self.colors['game_over'])
+                self.draw_text("Press [R] to play again", self.screen_width // 2 - 100, self.screen_height // 2 + 10, color=self.colors['game_over'])
+        finally:
+            self.screen.unlock()
+
+        # All text goes out in one call, on top of the slots and tracks drawn above
+        if self._fblits is not None:
+            self._fblits(self._blit_queue)
+        else:
+            self.screen.blits(self._blit_queue, doreturn=False)
+        self._frame_rects.extend(pygame.Rect(dest, surface.get_size()) for surface, dest in self._blit_queue)
+        self._blit_queue.clear()
+
+        # Outside what this frame and the last one drew, the screen is still the same background.
+        # Present just those areas while they are small; past that a full flip is cheaper.
+        frame_rects = self._frame_rects
+        presented_rects = self._presented_rects
+        if presented_rects is not None:
+            dirty_rects = frame_rects + presented_rects
+            if sum(rect.w * rect.h for rect in dirty_rects) < self.screen_width * self.screen_height // 4:
+                pygame.display.update(dirty_rects)
+            else:
+                pygame.display.flip()
+        else:
+            pygame.display.flip()
+        self._presented_rects = frame_rects
+        self._frame_rects = []
 
     def draw_player_side(self):
         player = self.game.players["player"]
-        slot_width = 160
-        slot_height = 130
-        gap = 30
+        # Bound once; these run for every slot and hand card
+        draw_text = self.draw_text # Only for wrapped spell effects
+        blit_text = self.blit_text
+        text_color = self.colors['text']
+        label = self.label
+        draw_rect = pygame.draw.rect
+        screen = self.screen
+        colors = self.colors
+        input_mode = self.input_mode
+        queue_blit = self._blit_queue.append
+        blank_slots = self._blank_slots
+        slot_rects = self._slot_rects
+        highlight_rects = self._highlight_rects
+        mark_dirty = self._frame_rects.append # Highlights are the only rects drawn outside the background
         
         # --- ROW 1: SPIRIT FIELD (Front Row - Closer to Center) ---
-        # Y position: Center (450) + offset (e.g., 50px)
-        spirit_y = 500
-        spirit_x_start = self.get_centered_start_x(3, slot_width, gap)
+        # Highlight Logic: bit i is set when slot i can be picked in the current mode
+        if input_mode == "SUMMON_SLOT":
+            spirit_mask = sum(1 << i for i, spirit in enumerate(player.spirit_slots) if spirit is None)
+        elif input_mode == "ATTACK_SLOT":
+            spirit_mask = sum(1 << i for i, spirit in enumerate(player.spirit_slots)
+                              if spirit is not None and player.aether >= spirit.activation_cost)
+        else:
+            spirit_mask = 0
 
-        for i in range(3):
-            x = spirit_x_start + i * (slot_width + gap)
-            y = spirit_y
-            
-            # Highlight Logic
-            is_valid_summon_slot = (self.input_mode == "SUMMON_SLOT" and player.spirit_slots[i] is None)
-            is_valid_attacker_slot = (self.input_mode == "ATTACK_SLOT" and player.spirit_slots[i] is not None and player.aether >= player.spirit_slots[i].activation_cost)
+        for i, rect in enumerate(slot_rects["player_spirit"]):
+            x, y = rect.topleft
+            spirit = player.spirit_slots[i]
 
-            if is_valid_summon_slot or is_valid_attacker_slot:
-                pygame.draw.rect(self.screen, self.colors['highlight'], (x-3, y-3, slot_width+6, slot_height+6), border_radius=5)
+            highlighted = spirit_mask >> i & 1
+            if highlighted:
+                # The slot itself is in the background; redraw it over the highlight
+                mark_dirty(draw_rect(screen, colors['highlight'], highlight_rects["player_spirit"][i], border_radius=5))
+                draw_rect(screen, colors['player_slots'], rect, border_radius=5)
 
-            pygame.draw.rect(self.screen, self.colors['player_slots'], (x, y, slot_width, slot_height), border_radius=5)
-            spirit = player.spirit_slots[i]
             if spirit:
-                self.draw_text(f"[{i+1}] {spirit.name}", x+5, y+5)
-                self.draw_text(f"HP: {spirit.current_hp}/{spirit.max_hp}", x+5, y+25)
-                self.draw_text(f"P:{spirit.power} D:{spirit.defense}", x+5, y+45)
-                self.draw_text(f"Cost:{spirit.activation_cost}", x+5, y+65)
-            else:
-                self.draw_text(f"Spirit [{i+1}]", x+5, y+5)
+                if not highlighted:
+                    queue_blit((blank_slots["player_spirit"], (x, y))) # Cover the baked empty-slot label
+                blit_text(label("spirit", i+1, spirit.name), x+5, y+5, text_color)
+                blit_text(label("spirit_hp", spirit.current_hp, spirit.max_hp), x+5, y+25, text_color)
+                blit_text(label("spirit_stats", spirit.power, spirit.defense), x+5, y+45, text_color)
+                blit_text(label("spirit_cost", spirit.activation_cost), x+5, y+65, text_color)
+            elif highlighted:
+                blit_text(label("empty_spirit", i+1), x+5, y+5, text_color) # The redrawn slot covered the baked label
 
         # --- ROW 2: SPELL FIELD (Back Row - Further from Center) ---
-        spell_y = 660
-        spell_x_start = self.get_centered_start_x(4, slot_width, gap)
-
-        for i in range(4):
-            x = spell_x_start + i * (slot_width + gap)
-            y = spell_y
+        # Highlight Logic: empty slots or a matching stack with room when preparing, any stack when activating
+        if input_mode == "PREPARE_SLOT":
+            selected_id = self.selected_card.proto_id
+            spell_mask = sum(1 << i for i, spell_stack in enumerate(player.spell_slots)
+                             if not spell_stack or (spell_stack[0].proto_id == selected_id and len(spell_stack) < 3))
+        elif input_mode == "ACTIVATE_SLOT":
+            spell_mask = sum(1 << i for i, spell_stack in enumerate(player.spell_slots) if spell_stack)
+        else:
+            spell_mask = 0
 
-            # Highlight Logic
-            is_valid_prepare_slot = self.input_mode == "PREPARE_SLOT" and \
-                                    (not player.spell_slots[i] or \
-                                    (player.spell_slots[i][0].name == self.selected_card.name and len(player.spell_slots[i]) < 3))
-            is_valid_activate_slot = self.input_mode == "ACTIVATE_SLOT" and player.spell_slots[i]
+        for i, rect in enumerate(slot_rects["player_spell"]):
+            x, y = rect.topleft
+            spell_stack = player.spell_slots[i]
 
-            if is_valid_prepare_slot or is_valid_activate_slot:
-                 pygame.draw.rect(self.screen, self.colors['highlight'], (x-3, y-3, slot_width+6, 126), border_radius=5)
+            highlighted = spell_mask >> i & 1
+            if highlighted:
+                 mark_dirty(draw_rect(screen, colors['highlight'], highlight_rects["player_spell"][i], border_radius=5))
+                 draw_rect(screen, colors['player_slots'], rect, border_radius=5)
 
-            pygame.draw.rect(self.screen, self.colors['player_slots'], (x, y, slot_width, 120), border_radius=5)
-            spell_stack = player.spell_slots[i]
             if spell_stack:
+                if not highlighted:
+                    queue_blit((blank_slots["player_spell"], (x, y))) # Cover the baked empty-slot label
                 spell = spell_stack[0]
-                self.draw_text(f"[{i+1}] {spell.name} x{len(spell_stack)}", x+5, y+5)
-                self.draw_text(f"Cost: {spell.activation_cost}", x+5, y+25)
-                self.draw_text(f"{spell.effect}", x+5, y+45, wrap=True, max_width=150)
-            else:
-                self.draw_text(f"Spell [{i+1}]", x+5, y+5)
+                blit_text(label("spell", i+1, spell.name, len(spell_stack)), x+5, y+5, text_color)
+                blit_text(label("spell_cost", spell.activation_cost), x+5, y+25, text_color)
+                draw_text(spell.effect, x+5, y+45, wrap=True, max_width=150)
+            elif highlighted:
+                blit_text(label("empty_spell", i+1), x+5, y+5, text_color) # The redrawn slot covered the baked label
 
         # --- TRACKS (Bottom) ---
+        # The track bars are part of the background; only the values are drawn here
         track_y = 780
-        pygame.draw.rect(self.screen, self.colors['hp_track'], (50, track_y, 200, 30))
-        hp_text = f"HP: {player.wizard_hp}/20"
-        self.draw_text(hp_text, 60, track_y+5)
+        if spell_mask:
+            # Spell highlights reach 3px under the bars, so put the bars back on top
+            draw_rect(screen, colors['hp_track'], (50, track_y, 200, 30))
+            draw_rect(screen, colors['aether_track'], (300, track_y, 200, 30))
+        hp_text = label("wizard_hp", player.wizard_hp)
+        blit_text(hp_text, 60, track_y+5, text_color)
 
-        pygame.draw.rect(self.screen, self.colors['aether_track'], (300, track_y, 200, 30))
-        aether_text = f"Aether: {player.aether}/16"
-        self.draw_text(aether_text, 310, track_y+5)
+        aether_text = label("aether", player.aether)
+        blit_text(aether_text, 310, track_y+5, text_color)
 
         # --- Draw player hand (Moved from draw_game_info) ---
-        hand_x = 1200
-        hand_y_start = 500 # Align with top of spirit slots
-        
-        self.draw_text("Player Hand:", hand_x, hand_y_start)
-        
-        for i, card in enumerate(player.hand):
-            hand_text = f"[{i+1}] {card.name} ({card.type})"
-            hand_y = hand_y_start + 30 + i * 20 # Start list 30px below title
-
-            # Highlight logic
-            is_valid_card = (self.input_mode == "SUMMON_CARD" and card.type == "spirit") or \
-                            (self.input_mode == "PREPARE_CARD" and card.type == "spell")
-
-            if is_valid_card:
-                self.draw_text(hand_text, hand_x, hand_y, color=self.colors['highlight'])
-            else:
-                self.draw_text(hand_text, hand_x, hand_y)
+        # Title is part of the background at (1200, 500); the list starts 30px below it
+        if player.hand:
+            self._blit_queue.append((self.hand_panel(player.hand, input_mode), (1200, 530)))
 
 
     def draw_npc_side(self):
         npc = self.game.players["npc"]
-        slot_width = 160
-        slot_height = 130
-        gap = 30
+        # Bound once; these run for every slot and hand card
+        draw_text = self.draw_text # Only for wrapped spell effects
+        blit_text = self.blit_text
+        text_color = self.colors['text']
+        label = self.label
+        draw_rect = pygame.draw.rect
+        screen = self.screen
+        colors = self.colors
+        input_mode = self.input_mode
+        queue_blit = self._blit_queue.append
+        blank_slots = self._blank_slots
+        slot_rects = self._slot_rects
+        highlight_rects = self._highlight_rects
+        mark_dirty = self._frame_rects.append # Highlights are the only rects drawn outside the background
 
         # --- ROW 1: SPELL FIELD (Back Row - Furthest from Center/Top of screen) ---
-        spell_y = 100
-        spell_x_start = self.get_centered_start_x(4, slot_width, gap)
-
-        for i in range(4):
-            x = spell_x_start + i * (slot_width + gap)
-            y = spell_y
-            pygame.draw.rect(self.screen, self.colors['npc_slots'], (x, y, slot_width, 120), border_radius=5)
+        for i, rect in enumerate(slot_rects["npc_spell"]):
+            x, y = rect.topleft
             spell_stack = npc.spell_slots[i]
+            # Empty slots are entirely background
             if spell_stack:
+                queue_blit((blank_slots["npc_spell"], (x, y))) # Cover the baked empty-slot label
                 spell = spell_stack[0]
-                self.draw_text(f"[{i+1}] {spell.name} x{len(spell_stack)}", x+5, y+5)
-                self.draw_text(f"Cost: {spell.activation_cost}", x+5, y+25)
-                self.draw_text(f"{spell.effect}", x+5, y+45, wrap=True, max_width=150)
-            else:
-                self.draw_text(f"Spell [{i+1}]", x+5, y+5)
+                blit_text(label("spell", i+1, spell.name, len(spell_stack)), x+5, y+5, text_color)
+                blit_text(label("spell_cost", spell.activation_cost), x+5, y+25, text_color)
+                draw_text(spell.effect, x+5, y+45, wrap=True, max_width=150)
 
         # --- ROW 2: SPIRIT FIELD (Front Row - Closer to Center) ---
-        spirit_y = 240
-        spirit_x_start = self.get_centered_start_x(3, slot_width, gap)
-
-        for i in range(3):
-            x = spirit_x_start + i * (slot_width + gap)
-            y = spirit_y
+        # Highlight Logic: any occupied slot is a valid attack target
+        if input_mode == "ATTACK_TARGET":
+            target_mask = sum(1 << i for i, spirit in enumerate(npc.spirit_slots) if spirit is not None)
+        else:
+            target_mask = 0
 
-            # Highlight Logic
-            is_valid_target = (self.input_mode == "ATTACK_TARGET" and npc.spirit_slots[i] is not None)
+        for i, rect in enumerate(slot_rects["npc_spirit"]):
+            x, y = rect.topleft
+            spirit = npc.spirit_slots[i]
 
+            is_valid_target = target_mask >> i & 1
             if is_valid_target:
-                pygame.draw.rect(self.screen, self.colors['highlight'], (x-3, y-3, slot_width+6, slot_height+6), border_radius=5)
+                mark_dirty(draw_rect(screen, colors['highlight'], highlight_rects["npc_spirit"][i], border_radius=5))
+                draw_rect(screen, colors['npc_slots'], rect, border_radius=5)
 
-            pygame.draw.rect(self.screen, self.colors['npc_slots'], (x, y, slot_width, slot_height), border_radius=5)
-            spirit = npc.spirit_slots[i]
+            # Empty slots are entirely background (and never targetable)
             if spirit:
-                self.draw_text(f"[{i+1}] {spirit.name}", x+5, y+5)
-                self.draw_text(f"HP: {spirit.current_hp}/{spirit.max_hp}", x+5, y+25)
-                self.draw_text(f"P:{spirit.power} D:{spirit.defense}", x+5, y+45)
-                self.draw_text(f"Cost:{spirit.activation_cost}", x+5, y+65)
-            else:
-                self.draw_text(f"Spirit [{i+1}]", x+5, y+5)
+                if not is_valid_target:
+                    queue_blit((blank_slots["npc_spirit"], (x, y))) # Cover the baked empty-slot label
+                blit_text(label("spirit", i+1, spirit.name), x+5, y+5, text_color)
+                blit_text(label("spirit_hp", spirit.current_hp, spirit.max_hp), x+5, y+25, text_color)
+                blit_text(label("spirit_stats", spirit.power, spirit.defense), x+5, y+45, text_color)
+                blit_text(label("spirit_cost", spirit.activation_cost), x+5, y+65, text_color)
 
         # --- TRACKS (Top) ---
-        pygame.draw.rect(self.screen, self.colors['hp_track'], (50, 40, 200, 30))
-        hp_text = f"NPC HP: {npc.wizard_hp}/20"
-        self.draw_text(hp_text, 60, 45)
+        # The track bars are part of the background; only the values are drawn here
+        hp_text = label("npc_hp", npc.wizard_hp)
+        blit_text(hp_text, 60, 45, text_color)
+
+        aether_text = label("aether", npc.aether)
+        blit_text(aether_text, 310, 45, text_color)
 
-        pygame.draw.rect(self.screen, self.colors['aether_track'], (300, 40, 200, 30))
-        aether_text = f"Aether: {npc.aether}/16"
-        self.draw_text(aether_text, 310, 45)
 
+    def hand_panel(self, hand, input_mode):
+        """Returns the hand list as one Surface, only re-rendering it when the hand or its highlighting changes."""
+        # Highlight logic
+        if input_mode == "SUMMON_CARD":
+            valid_type = SPIRIT
+        elif input_mode == "PREPARE_CARD":
+            valid_type = SPELL
+        else:
+            valid_type = None
+
+        key = (tuple(hand), valid_type)
+        if key == self._hand_panel_key:
+            return self._hand_panel
+
+        colors = self.colors
+        lines = [
+            self.render_text(
+                self.label("hand_card", i+1, card.name, card.type),
+                colors['highlight'] if card.type is valid_type else colors['text'],
+            )
+            for i, card in enumerate(hand)
+        ]
+        panel = self.build_panel(lines, 20)
+
+        self._hand_panel_key = key
+        self._hand_panel = panel
+        return panel
+
+    def log_panel(self, message):
+        """Returns the wrapped log line as one Surface, only re-rendering it when the message changes."""
+        if message == self._log_panel_message:
+            return self._log_panel
+
+        color = self.colors['log_text']
+        lines = [self.render_text(line, color) for line in self.wrap_text(f"Log: {message}", 700)]
+        panel = self.build_panel(lines, self.font.get_linesize() + 2) # 2px line spacing, as in draw_text
+
+        self._log_panel_message = message
+        self._log_panel = panel
+        return panel
+
+    def build_panel(self, lines, row_height):
+        """Stacks rendered text lines row_height apart on an opaque Surface filled with the background color."""
+        width = max(line.get_width() for line in lines)
+        height = (len(lines) - 1) * row_height + lines[-1].get_height()
+        panel = pygame.Surface((width, height)).convert(self.screen)
+        panel.fill(self.colors['background'])
+        panel.blits([(line, (0, i * row_height)) for i, line in enumerate(lines)], doreturn=False)
+        return panel
 
     def draw_game_info(self):
-        phase_text = f"Turn {self.game.turn_count} - {self.game.current_player.upper()} - Phase: {self.game.current_phase.value}"
+        # Draw last message
+        # First, since the panel is opaque: a two-line log reaches down beside the prompt row
+        self._blit_queue.append((self.log_panel(self.last_message), (440, 820)))
+
+        phase_text = self.label("phase", self.game.turn_count, self.game.current_player.upper(), self.game.current_phase.value)
         self.draw_text(phase_text, 50, 820)
 
         # --- MODIFIED: Show contextual prompt ---
         if self.action_prompt:
              self.draw_text(self.action_prompt, 50, 850, color=self.colors['prompt_text'])
         else:
-            commands = "Actions: [1]Summon [2]Prepare [3]Activate [4]Attack [5]End Phase [R]New Game"
-            self.draw_text(commands, 50, 850)
+            self._blit_queue.append((self._commands_surface, (50, 850)))
 
         # Draw player hand
         # --- (This section has been removed and moved to draw_player_side) ---
 
-        # Draw last message
-        self.draw_text(f"Log: {self.last_message}", 440, 820, color=self.colors['log_text'], wrap=True, max_width=700)
-
     def draw_text(self, text, x, y, color=None, wrap=False, max_width=110):
         if color is None:
             color = self.colors['text']
 
         if not wrap:
-            text_surface = self.font.render(text, True, color)
-            self.screen.blit(text_surface, (x, y))
+            self.blit_text(text, x, y, color)
             return
 
+        line_height = self.font.get_linesize() + 2 # 2px line spacing
+        queue_blit = self._blit_queue.append
+        render_text = self.render_text
+
+        for i, line in enumerate(self.wrap_text(text, max_width)):
+            queue_blit((render_text(line, color), (x, y + i * line_height)))
+
+    def blit_text(self, text, x, y, color):
+        """Queues a single line of text; draw_text without the wrapping and default color, for the slot loops."""
+        self._blit_queue.append((self.render_text(text, color), (x, y)))
+
+    def label(self, kind, *values):
+        """Returns the _LABEL_FORMATS[kind] label for values, formatting each combination only once."""
+        key = (kind,) + values
+        text = self._label_cache.get(key)
+        if text is None:
+            text = _LABEL_FORMATS[kind].format(*values)
+            self._label_cache[key] = text
+        return text
+
+    def wrap_text(self, text, max_width):
+        """Splits text into lines no wider than max_width; each distinct (text, width) is only measured once."""
+        key = (text, max_width)
+        lines = self._wrap_cache.get(key)
+        if lines is not None:
+            return lines
+
         # --- Word wrap logic ---
         words = text.split(' ')
-        line_spacing = 2
-        line_height = self.font.get_linesize() + line_spacing
-
         lines = []
         current_line = ""
 
@@ -265,6 +509,9 @@ class ArcanaVisualizer:
                 lines.append(text[:est_chars] + '...')
             else:
                 lines.append(text)
+        elif text[0] != " " and self.font.size(text)[0] <= max_width:
+            # Fits on one line (the usual case for the log): one measurement instead of one per word
+            lines.append(text)
         else:
             for word in words:
                 # --- This is the fixed logic ---
@@ -282,17 +529,45 @@ class ArcanaVisualizer:
             lines.append(current_line) # Add the last line
         # --- End of fix ---
 
-        for i, line in enumerate(lines):
-            text_surface = self.font.render(line, True, color)
-            self.screen.blit(text_surface, (x, y + i * line_height))
+        if len(self._wrap_cache) >= 256:
+            # New log messages keep arriving; start over rather than grow forever
+            self._wrap_cache.clear()
+        lines = tuple(lines)
+        self._wrap_cache[key] = lines
+        return lines
+
+    def render_text(self, text, color):
+        """Returns a rendered Surface for text, reusing the one from earlier frames if there is one."""
+        key = (text, color)
+        cache = self._text_cache
+        text_surface = cache.get(key)
+        if text_surface is None:
+            # Store it in the display's pixel format so blits don't convert it every frame
+            text_surface = self.font.render(text, True, color).convert_alpha(self.screen)
+            cache[key] = text_surface
+            if len(cache) > 512:
+                # Log lines and HP/Aether values keep producing new strings; drop the stalest one
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        return text_surface
 
     # --- THIS IS THE NEW INPUT HANDLER ---
     def handle_input(self):
         player = self.game.players["player"]
 
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        if not events:
+            # Nothing changes until the player presses something; sleep until then instead of polling at 30 FPS
+            events = (pygame.event.wait(50),)
+
+        for event in events:
             if event.type == pygame.QUIT:
                 return False
+            if event.type == pygame.VIDEOEXPOSE:
+                # Window contents were lost; repaint and present all of it on the next draw
+                self._drawn_state = None
+                self._presented_rects = None
 
             # Global keys
             if event.type == pygame.KEYDOWN:
@@ -303,16 +578,14 @@ class ArcanaVisualizer:
                     else:
                         return False # Quit
                 if event.key == pygame.K_r:
-                    # --- Pass the manager on reset ---
-                    self.game = ArcanaGame(self.card_manager) 
+                    self.game.reset()
                     self.last_message = "New game started!"
                     self.reset_input_state()
                     return True 
 
             if self.game.game_over or self.game.current_player != "player":
                 if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
-                    # --- Pass the manager on reset ---
-                    self.game = ArcanaGame(self.card_manager) 
+                    self.game.reset()
                     self.last_message = "New game started!"
                     self.reset_input_state()
                     return True
@@ -323,133 +596,139 @@ class ArcanaVisualizer:
                 key = event.key
 
                 # 0-9 number keys
-                num_key = -1
-                if pygame.K_0 <= key <= pygame.K_9:
-                    num_key = key - pygame.K_0
-                if pygame.K_KP0 <= key <= pygame.K_KP9:
-                    num_key = key - pygame.K_KP9
-
-                # --- NORMAL MODE: Select an action ---
-                if self.input_mode == "NORMAL":
-                    if key == pygame.K_1: # Summon
-                        if self.game.current_phase != Phase.MEMORIZATION:
-                            self.last_message = "Can only summon in Memorization phase."
-                            continue
-                        self.input_mode = "SUMMON_CARD"
-                        self.action_prompt = "Select a Spirit from hand [1-9] (ESC to cancel)"
-                    elif key == pygame.K_2: # Prepare
-                        if self.game.current_phase != Phase.MEMORIZATION:
-                            self.last_message = "Can only prepare in Memorization phase."
-                            continue
-                        self.input_mode = "PREPARE_CARD"
-                        self.action_prompt = "Select a Spell from hand [1-9] (ESC to cancel)"
-                    elif key == pygame.K_3: # Activate
-                        if self.game.current_phase != Phase.INVOCATION:
-                            self.last_message = "Can only activate in Invocation phase."
-                            continue
-                        self.input_mode = "ACTIVATE_SLOT"
-                        self.action_prompt = "Select a Spell slot to activate [1-4] (ESC to cancel)"
-                    elif key == pygame.K_4: # Attack
-                        if self.game.current_phase != Phase.INVOCATION:
-                            self.last_message = "Can only attack in Invocation phase."
-                            continue
-                        self.input_mode = "ATTACK_SLOT"
-                        self.action_prompt = "Select your Spirit to attack with [1-3] (ESC to cancel)"
-                    elif key == pygame.K_5: # End Phase
-                        self.game.next_phase()
-                        self.last_message = f"Phase advanced to {self.game.current_phase.value}"
-
-                # --- SUMMON MODE ---
-                elif self.input_mode == "SUMMON_CARD":
-                    if 1 <= num_key <= len(player.hand):
-                        card = player.hand[num_key - 1]
-                        if card.type == "spirit":
-                            self.selected_card = card
-                            self.input_mode = "SUMMON_SLOT"
-                            self.action_prompt = f"Select slot for {card.name} [1-3] (ESC to cancel)"
-                        else:
-                            self.last_message = f"{card.name} is not a Spirit. Select a Spirit."
-                    else:
-                        self.last_message = "Invalid hand number."
-
-                elif self.input_mode == "SUMMON_SLOT":
-                    if 1 <= num_key <= 3:
-                        slot_index = num_key - 1
-                        success, message = self.game.summon_spirit("player", self.selected_card.name, slot_index)
-                        self.last_message = message
-                        self.reset_input_state()
-                    else:
-                        self.last_message = "Invalid slot number. Select [1-3]."
-
-                # --- PREPARE MODE ---
-                elif self.input_mode == "PREPARE_CARD":
-                    if 1 <= num_key <= len(player.hand):
-                        card = player.hand[num_key - 1]
-                        if card.type == "spell":
-                            self.selected_card = card
-                            self.input_mode = "PREPARE_SLOT"
-                            self.action_prompt = f"Select slot for {card.name} [1-4] (ESC to cancel)"
-                        else:
-                            self.last_message = f"{card.name} is not a Spell. Select a Spell."
-                    else:
-                        self.last_message = "Invalid hand number."
+                num_key = _NUM_KEYS.get(key, -1)
 
-                elif self.input_mode == "PREPARE_SLOT":
-                    if 1 <= num_key <= 4:
-                        slot_index = num_key - 1
-                        success, message = self.game.prepare_spell("player", self.selected_card.name, slot_index)
-                        self.last_message = message
-                        self.reset_input_state()
-                    else:
-                        self.last_message = "Invalid slot number. Select [1-4]."
-
-                # --- ACTIVATE MODE ---
-                elif self.input_mode == "ACTIVATE_SLOT":
-                    if 1 <= num_key <= 4:
-                        slot_index = num_key - 1
-                        if not player.spell_slots[slot_index]:
-                            self.last_message = "That slot is empty."
-                            continue
-                        success, message = self.game.activate_spell("player", slot_index, 1)
-                        self.last_message = message
-                        self.reset_input_state()
-                    else:
-                        self.last_message = "Invalid slot number. Select [1-4]."
-
-                # --- ATTACK MODE ---
-                elif self.input_mode == "ATTACK_SLOT":
-                    if 1 <= num_key <= 3:
-                        slot_index = num_key - 1
-                        spirit = player.spirit_slots[slot_index]
-                        if not spirit:
-                            self.last_message = "That slot is empty."
-                            continue
-                        if player.aether < spirit.activation_cost:
-                            self.last_message = f"Not enough Aether for {spirit.name}."
-                            continue
-
-                        self.selected_slot = slot_index
-                        self.input_mode = "ATTACK_TARGET"
-                        self.action_prompt = f"Select target for {spirit.name} [1-3], or [0] for Wizard (ESC to cancel)"
-                    else:
-                        self.last_message = "Invalid slot number. Select [1-3]."
-
-                elif self.input_mode == "ATTACK_TARGET":
-                    if 0 <= num_key <= 3:
-                        attacker_slot = self.selected_slot
-                        if num_key == 0: # Target Wizard
-                            success, message = self.game.attack_with_spirit("player", attacker_slot, "wizard")
-                        else: # Target Spirit
-                            target_slot = num_key - 1
-                            success, message = self.game.attack_with_spirit("player", attacker_slot, "spirit", target_slot)
-
-                        self.last_message = message
-                        self.reset_input_state()
-                    else:
-                        self.last_message = "Invalid target. Select NPC spirit [1-3] or Wizard [0]."
+                self._mode_handlers[self.input_mode](key, num_key, player)
 
         return True
 
+    # --- NORMAL MODE: Select an action ---
+    def _on_normal_key(self, key, num_key, player):
+        """Pick an action [1-5]"""
+        if key == pygame.K_1: # Summon
+            if self.game.current_phase is not _MEMORIZATION:
+                self.last_message = "Can only summon in Memorization phase."
+                return
+            self.input_mode = "SUMMON_CARD"
+            self.action_prompt = "Select a Spirit from hand [1-9] (ESC to cancel)"
+        elif key == pygame.K_2: # Prepare
+            if self.game.current_phase is not _MEMORIZATION:
+                self.last_message = "Can only prepare in Memorization phase."
+                return
+            self.input_mode = "PREPARE_CARD"
+            self.action_prompt = "Select a Spell from hand [1-9] (ESC to cancel)"
+        elif key == pygame.K_3: # Activate
+            if self.game.current_phase is not _INVOCATION:
+                self.last_message = "Can only activate in Invocation phase."
+                return
+            self.input_mode = "ACTIVATE_SLOT"
+            self.action_prompt = "Select a Spell slot to activate [1-4] (ESC to cancel)"
+        elif key == pygame.K_4: # Attack
+            if self.game.current_phase is not _INVOCATION:
+                self.last_message = "Can only attack in Invocation phase."
+                return
+            self.input_mode = "ATTACK_SLOT"
+            self.action_prompt = "Select your Spirit to attack with [1-3] (ESC to cancel)"
+        elif key == pygame.K_5: # End Phase
+            self.game.next_phase()
+            self.last_message = f"Phase advanced to {self.game.current_phase.value}"
+
+    # --- SUMMON MODE ---
+    def _on_summon_card_key(self, key, num_key, player):
+        """Pick the Spirit to summon from hand"""
+        if 1 <= num_key <= len(player.hand):
+            card = player.hand[num_key - 1]
+            if card.type is SPIRIT:
+                self.selected_card = card
+                self.input_mode = "SUMMON_SLOT"
+                self.action_prompt = f"Select slot for {card.name} [1-3] (ESC to cancel)"
+            else:
+                self.last_message = f"{card.name} is not a Spirit. Select a Spirit."
+        else:
+            self.last_message = "Invalid hand number."
+
+    def _on_summon_slot_key(self, key, num_key, player):
+        """Pick the slot to summon the selected Spirit into"""
+        if 1 <= num_key <= 3:
+            slot_index = num_key - 1
+            success, message = self.game.summon_spirit("player", self.selected_card.name, slot_index)
+            self.last_message = message
+            self.reset_input_state()
+        else:
+            self.last_message = "Invalid slot number. Select [1-3]."
+
+    # --- PREPARE MODE ---
+    def _on_prepare_card_key(self, key, num_key, player):
+        """Pick the Spell to prepare from hand"""
+        if 1 <= num_key <= len(player.hand):
+            card = player.hand[num_key - 1]
+            if card.type is SPELL:
+                self.selected_card = card
+                self.input_mode = "PREPARE_SLOT"
+                self.action_prompt = f"Select slot for {card.name} [1-4] (ESC to cancel)"
+            else:
+                self.last_message = f"{card.name} is not a Spell. Select a Spell."
+        else:
+            self.last_message = "Invalid hand number."
+
+    def _on_prepare_slot_key(self, key, num_key, player):
+        """Pick the slot to prepare the selected Spell in"""
+        if 1 <= num_key <= 4:
+            slot_index = num_key - 1
+            success, message = self.game.prepare_spell("player", self.selected_card.name, slot_index)
+            self.last_message = message
+            self.reset_input_state()
+        else:
+            self.last_message = "Invalid slot number. Select [1-4]."
+
+    # --- ACTIVATE MODE ---
+    def _on_activate_slot_key(self, key, num_key, player):
+        """Pick the Spell slot to activate"""
+        if 1 <= num_key <= 4:
+            slot_index = num_key - 1
+            if not player.spell_slots[slot_index]:
+                self.last_message = "That slot is empty."
+                return
+            success, message = self.game.activate_spell("player", slot_index, 1)
+            self.last_message = message
+            self.reset_input_state()
+        else:
+            self.last_message = "Invalid slot number. Select [1-4]."
+
+    # --- ATTACK MODE ---
+    def _on_attack_slot_key(self, key, num_key, player):
+        """Pick the Spirit to attack with"""
+        if 1 <= num_key <= 3:
+            slot_index = num_key - 1
+            spirit = player.spirit_slots[slot_index]
+            if not spirit:
+                self.last_message = "That slot is empty."
+                return
+            if player.aether < spirit.activation_cost:
+                self.last_message = f"Not enough Aether for {spirit.name}."
+                return
+
+            self.selected_slot = slot_index
+            self.input_mode = "ATTACK_TARGET"
+            self.action_prompt = f"Select target for {spirit.name} [1-3], or [0] for Wizard (ESC to cancel)"
+        else:
+            self.last_message = "Invalid slot number. Select [1-3]."
+
+    def _on_attack_target_key(self, key, num_key, player):
+        """Pick the NPC Spirit or Wizard to attack"""
+        if 0 <= num_key <= 3:
+            attacker_slot = self.selected_slot
+            if num_key == 0: # Target Wizard
+                success, message = self.game.attack_with_spirit("player", attacker_slot, "wizard")
+            else: # Target Spirit
+                target_slot = num_key - 1
+                success, message = self.game.attack_with_spirit("player", attacker_slot, "spirit", target_slot)
+
+            self.last_message = message
+            self.reset_input_state()
+        else:
+            self.last_message = "Invalid target. Select NPC spirit [1-3] or Wizard [0]."
+
     def run(self):
         running = True
         while running:
@@ -457,13 +736,20 @@ class ArcanaVisualizer:
 
             # AI turn logic
             if self.game.current_player == "npc" and not self.game.game_over:
-                pygame.time.delay(250) # Short pause
-                self.ai.execute_ai_turn(self.game)
-                self.last_message = "NPC turn finished. Your turn."
-                self.reset_input_state()
+                # Short pause, timed rather than slept so ESC/quit and repaints still go through
+                now = pygame.time.get_ticks()
+                if self._ai_turn_at is None:
+                    self._ai_turn_at = now + 250
+                elif now >= self._ai_turn_at:
+                    self._ai_turn_at = None
+                    self.ai.execute_ai_turn(self.game)
+                    self.last_message = "NPC turn finished. Your turn."
+                    self.reset_input_state()
+            else:
+                self._ai_turn_at = None # e.g. a new game was started during the pause
 
+            # Only repaints when the board changed (see draw_board)
             self.draw_board()
-            self.clock.tick(30)
 
         pygame.quit()
 